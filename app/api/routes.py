@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
 # Import services
-from app.core.query import query_documentation
+from app.core.query import query_documentation_async, query_documentation_stream
 
 # Create router
 router = APIRouter()
@@ -19,14 +20,27 @@ class QueryResponse(BaseModel):
 
 # Query endpoint
 @router.post("/query", response_model=QueryResponse)
-def query(request: QueryRequest):
+async def query(request: QueryRequest):
     """
     Query the API documentation with a natural language question.
     
     Returns an answer generated from the most relevant documentation chunks.
     """
     try:
-        result = query_documentation(request.query, request.top_k)
+        result = await query_documentation_async(request.query, request.top_k)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Streaming query endpoint
+@router.post("/query/stream")
+def query_stream(request: QueryRequest):
+    """
+    Query the API documentation, streaming the answer as it is generated.
+    
+    Returns server-sent events: the sources first, then the answer text in pieces.
+    """
+    return StreamingResponse(
+        query_documentation_stream(request.query, request.top_k),
+        media_type="text/event-stream"
+    )
\ No newline at end of file
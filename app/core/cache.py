@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+class LRUCache:
+    """
+    A thread-safe mapping that evicts the least recently used entry when full.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: The maximum number of entries to keep
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value, marking it as recently used.
+        
+        Returns:
+            The cached value, or None if the key is not cached
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """
+        Cache a value, evicting the least recently used entry if the cache is full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Get a snapshot of the cached entries, least recently used first.
+        """
+        with self._lock:
+            return iter(list(self._data.items()))
+    
+    def __len__(self) -> int:
+        return len(self._data)
\ No newline at end of file
@@ -1,7 +1,95 @@
 import re
+import mmap
 import tiktoken
 import os
-from typing import List, Dict, Any, Optional
+import multiprocessing
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# File types by extension, built once at import
+FILE_TYPES = {
+    # Markdown
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+    
+    # Programming languages
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.cxx': 'cpp',
+    '.c': 'c',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.scala': 'scala',
+    '.r': 'r',
+    '.m': 'matlab',
+    '.pl': 'perl',
+    '.sh': 'bash',
+    '.bash': 'bash',
+    '.zsh': 'bash',
+    '.fish': 'bash',
+    '.ps1': 'powershell',
+    '.bat': 'batch',
+    '.cmd': 'batch',
+    
+    # Web technologies
+    '.html': 'html',
+    '.htm': 'html',
+    '.css': 'css',
+    '.scss': 'scss',
+    '.sass': 'sass',
+    '.less': 'less',
+    '.xml': 'xml',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.cfg': 'ini',
+    '.conf': 'ini',
+    
+    # Documentation
+    '.txt': 'text',
+    '.rst': 'rst',
+    '.adoc': 'asciidoc',
+    '.tex': 'latex',
+    
+    # Configuration files
+    '.env': 'env',
+    '.gitignore': 'gitignore',
+    '.dockerfile': 'dockerfile',
+    '.dockerignore': 'dockerignore',
+    '.gitattributes': 'gitattributes',
+    
+    # Data files
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.sql': 'sql',
+    '.graphql': 'graphql',
+    '.gql': 'graphql',
+}
+
+# How chunking worker processes are started; forkserver forks them from a
+# single-threaded server process, where it is available
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Files at least this large are memory-mapped rather than read
+MMAP_MIN_BYTES = 4 << 20
+
+# Fewer texts than this are tokenized one by one, since handing them to a
+# thread pool costs more than encoding them
+BATCH_TOKENIZE_MIN_TEXTS = 16
 
 def get_file_type(file_path: str) -> str:
     """
@@ -15,95 +103,306 @@ def get_file_type(file_path: str) -> str:
     """
     _, ext = os.path.splitext(file_path.lower())
     
-    # Define file type mappings
-    file_types = {
-        # Markdown
-        '.md': 'markdown',
-        '.markdown': 'markdown',
+    return FILE_TYPES.get(ext, 'text')
+
+@lru_cache(maxsize=8)
+def _get_encoder(model: str = "gpt-4") -> tiktoken.Encoding:
+    """
+    Get the tiktoken encoder for a model, building it only once per model.
+    """
+    return tiktoken.encoding_for_model(model)
+
+def get_token_count(text: str, model: str = "gpt-4") -> int:
+    """
+    Count the number of tokens in a text string.
+    
+    Args:
+        text: The text to count tokens for
+        model: The model to use for tokenization
         
-        # Programming languages
-        '.py': 'python',
-        '.js': 'javascript',
-        '.ts': 'typescript',
-        '.jsx': 'javascript',
-        '.tsx': 'typescript',
-        '.java': 'java',
-        '.cpp': 'cpp',
-        '.cc': 'cpp',
-        '.cxx': 'cpp',
-        '.c': 'c',
-        '.h': 'c',
-        '.hpp': 'cpp',
-        '.go': 'go',
-        '.rs': 'rust',
-        '.php': 'php',
-        '.rb': 'ruby',
-        '.swift': 'swift',
-        '.kt': 'kotlin',
-        '.scala': 'scala',
-        '.r': 'r',
-        '.m': 'matlab',
-        '.pl': 'perl',
-        '.sh': 'bash',
-        '.bash': 'bash',
-        '.zsh': 'bash',
-        '.fish': 'bash',
-        '.ps1': 'powershell',
-        '.bat': 'batch',
-        '.cmd': 'batch',
+    Returns:
+        The number of tokens in the text
+    """
+    return len(_get_encoder(model).encode(text))
+
+def get_token_counts(texts: List[str], model: str = "gpt-4") -> List[int]:
+    """
+    Count the number of tokens in many text strings, with one batched call
+    across threads if there are at least BATCH_TOKENIZE_MIN_TEXTS of them.
+    
+    Args:
+        texts: The texts to count tokens for
+        model: The model to use for tokenization
         
-        # Web technologies
-        '.html': 'html',
-        '.htm': 'html',
-        '.css': 'css',
-        '.scss': 'scss',
-        '.sass': 'sass',
-        '.less': 'less',
-        '.xml': 'xml',
-        '.json': 'json',
-        '.yaml': 'yaml',
-        '.yml': 'yaml',
-        '.toml': 'toml',
-        '.ini': 'ini',
-        '.cfg': 'ini',
-        '.conf': 'ini',
+    Returns:
+        The number of tokens in each text
+    """
+    encoder = _get_encoder(model)
+    if len(texts) < BATCH_TOKENIZE_MIN_TEXTS:
+        return [len(encoder.encode_ordinary(text)) for text in texts]
+    return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)]
+
+# File types that are split by functions/classes rather than paragraphs
+CODE_FILE_TYPES = ["python", "javascript", "typescript", "java", "cpp", "c", "go", "rust"]
+
+def _split_simple_text(text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split plain text into paragraphs.
+    
+    Returns:
+        A list of (paragraph, context) tuples; plain text has no context
+    """
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text.strip()):
+        paragraph = paragraph.strip()
+        if paragraph:
+            pieces.append((paragraph, None))
+    
+    return pieces
+
+# Patterns for recognizing logical units in different languages
+CODE_PATTERNS = {
+    "python": {
+        "function": r'def\s+\w+\s*\([^)]*\)\s*:',
+        "class": r'class\s+\w+',
+        "import": r'^(import|from)\s+',
+        "comment": r'^\s*#'
+    },
+    "javascript": {
+        "function": r'(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|let\s+\w+\s*=\s*\([^)]*\)\s*=>)',
+        "class": r'class\s+\w+',
+        "import": r'^(import|export)\s+',
+        "comment": r'^\s*//'
+    },
+    "typescript": {
+        "function": r'(function\s+\w+|const\s+\w+\s*:\s*[^=]*=\s*\([^)]*\)\s*=>|let\s+\w+\s*:\s*[^=]*=\s*\([^)]*\)\s*=>)',
+        "class": r'class\s+\w+',
+        "import": r'^(import|export)\s+',
+        "comment": r'^\s*//'
+    },
+    "java": {
+        "function": r'(public|private|protected)?\s*(static\s+)?\w+\s+\w+\s*\([^)]*\)\s*{',
+        "class": r'(public\s+)?class\s+\w+',
+        "import": r'^import\s+',
+        "comment": r'^\s*//'
+    }
+}
+
+# Labels used for the code context of each kind of match, in priority order
+_CODE_CONTEXT_LABELS = {
+    "function": "Function",
+    "class": "Class",
+    "import": "Import"
+}
+
+def _compile_code_pattern(pattern: Dict[str, str]) -> re.Pattern:
+    """
+    Combine a language's patterns into one regex so each line is scanned once.
+    
+    Each alternative is a lookahead over the whole line, so a line matching
+    several patterns is still classified by the first kind in priority order.
+    """
+    return re.compile("|".join(
+        f"(?=.*?(?P<{kind}>{pattern[kind]}))" for kind in _CODE_CONTEXT_LABELS
+    ))
+
+# Compile the patterns once at import time
+_COMPILED_CODE_PATTERNS = {
+    language: _compile_code_pattern(pattern)
+    for language, pattern in CODE_PATTERNS.items()
+}
+
+def _split_code(code: str, language: str = "python") -> List[Tuple[str, Optional[str]]]:
+    """
+    Split code into lines, tagging each line with the enclosing function/class/import.
+    
+    Returns:
+        A list of (line, code_context) tuples
+    """
+    pattern = _COMPILED_CODE_PATTERNS.get(language, _COMPILED_CODE_PATTERNS["python"])
+    
+    pieces = []
+    current_context = None
+    
+    for line in code.split('\n'):
+        # Check for function/class definitions
+        match = pattern.match(line)
+        if match:
+            current_context = f"{_CODE_CONTEXT_LABELS[match.lastgroup]}: {line.strip()}"
         
-        # Documentation
-        '.txt': 'text',
-        '.rst': 'rst',
-        '.adoc': 'asciidoc',
-        '.tex': 'latex',
+        pieces.append((line, current_context))
+    
+    return pieces
+
+# Markdown ATX headers, e.g. "## Installation"
+_MARKDOWN_HEADER = re.compile(r'^(#{1,6})[ \t]+([^\n]+)$', re.MULTILINE)
+
+def _split_markdown(markdown_text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split markdown text into sections, tagging each with its header breadcrumb.
+    
+    Returns:
+        A list of (section content, header_context) tuples
+    """
+    pieces = []
+    current_headers = []
+    
+    def add_section(start: int, end: int):
+        # The text between two headers belongs to the headers seen so far
+        content = markdown_text[start:end].strip()
+        if content:
+            header_context = " > ".join([h[1] for h in current_headers])
+            pieces.append((content, header_context))
+    
+    # Walk the headers in a single pass, slicing out the content between them
+    prev_end = 0
+    for match in _MARKDOWN_HEADER.finditer(markdown_text):
+        add_section(prev_end, match.start())
         
-        # Configuration files
-        '.env': 'env',
-        '.gitignore': 'gitignore',
-        '.dockerfile': 'dockerfile',
-        '.dockerignore': 'dockerignore',
-        '.gitattributes': 'gitattributes',
+        header = match.group(0).strip()
+        header_level = len(match.group(1))
         
-        # Data files
-        '.csv': 'csv',
-        '.tsv': 'csv',
-        '.sql': 'sql',
-        '.graphql': 'graphql',
-        '.gql': 'graphql',
-    }
+        # Remove headers of higher level (deeper nesting)
+        current_headers = [h for h in current_headers if h[0] < header_level]
+        current_headers.append((header_level, header))
+        prev_end = match.end()
+    
+    add_section(prev_end, len(markdown_text))
     
-    return file_types.get(ext, 'text')
+    return pieces
 
-def get_token_count(text: str, model: str = "gpt-4") -> int:
+def _get_splitter(file_type: str):
     """
-    Count the number of tokens in a text string.
+    Get the splitter, piece separator and context metadata key for a file type.
+    """
+    # For markdown files, use the specialized markdown chunking
+    if file_type == "markdown":
+        return _split_markdown, "\n\n", "header_context"
+    
+    # For code files, try to split by functions/classes
+    if file_type in CODE_FILE_TYPES:
+        return (lambda text: _split_code(text, file_type)), "\n", "code_context"
+    
+    # For other text files, use simple paragraph-based chunking
+    return _split_simple_text, "\n\n", None
+
+def _fits_in_one_chunk(pieces: List[Tuple[str, Optional[str]]], separator: str, chunk_size: int) -> bool:
+    """
+    Check, without tokenizing, whether a document's pieces certainly fit in one chunk.
+    
+    Every token covers at least one byte of UTF-8, so text of at most chunk_size
+    bytes can never be more than chunk_size tokens.
+    """
+    # Characters never outnumber bytes, so long documents are ruled out before encoding
+    total = len(separator) * max(len(pieces) - 1, 0)
+    if total + sum(len(piece) for piece, _ in pieces) > chunk_size:
+        return False
+    
+    total = len(separator.encode("utf-8")) * max(len(pieces) - 1, 0)
+    return total + sum(len(piece.encode("utf-8")) for piece, _ in pieces) <= chunk_size
+
+def _assemble_chunks(
+    pieces: List[Tuple[str, Optional[str]]],
+    piece_ids: List[List[int]],
+    separator: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    metadata: Dict[str, Any],
+    context_key: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pack pre-split pieces into chunks of at most chunk_size tokens.
+    
+    Each piece is encoded once up front and the chunk's token ids are built by
+    concatenating those of its pieces, so neither the size checks nor the
+    overlap ever re-tokenize the growing chunk. Documents that fit in one chunk
+    may pass empty token ids, since no chunk boundary is ever computed for them.
     
     Args:
-        text: The text to count tokens for
-        model: The model to use for tokenization
+        pieces: (text, context) tuples from one of the splitters
+        piece_ids: The token ids of each piece
+        separator: The string used to join pieces within a chunk
+        chunk_size: The maximum number of tokens per chunk
+        chunk_overlap: The number of tokens to overlap between chunks
+        metadata: Additional metadata to include with each chunk
+        context_key: The metadata key to store each chunk's context under
         
     Returns:
-        The number of tokens in the text
+        A list of dictionaries containing the chunks and their metadata
     """
-    encoder = tiktoken.encoding_for_model(model)
-    return len(encoder.encode(text))
+    encoder = _get_encoder()
+    separator_ids = encoder.encode_ordinary(separator)
+    
+    def make_chunk(content: str, context: Optional[str]) -> Dict[str, Any]:
+        chunk_metadata = metadata.copy()
+        if context_key and context is not None:
+            chunk_metadata[context_key] = context
+        return {
+            "content": content,
+            "metadata": chunk_metadata
+        }
+    
+    chunks = []
+    # Pieces and separators of the chunk being built, joined once when it is saved
+    current_pieces = []
+    current_ids = []
+    context = None
+    
+    for (piece, context), ids in zip(pieces, piece_ids):
+        # Check if adding this piece would exceed the chunk size
+        if current_pieces and len(current_ids) + len(separator_ids) + len(ids) > chunk_size:
+            # Save the current chunk
+            current_chunk = "".join(current_pieces)
+            chunks.append(make_chunk(current_chunk, context))
+            
+            # Start a new chunk with the last chunk_overlap tokens of this one
+            if chunk_overlap <= 0:
+                current_pieces = [piece] if piece else []
+                current_ids = list(ids)
+            elif len(current_ids) <= chunk_overlap:
+                current_pieces = [current_chunk, separator, piece]
+                current_ids = current_ids + separator_ids + ids
+            else:
+                overlap_ids = current_ids[-chunk_overlap:]
+                current_pieces = [encoder.decode(overlap_ids), separator, piece]
+                current_ids = overlap_ids + separator_ids + ids
+        elif current_pieces:
+            current_pieces.append(separator)
+            current_pieces.append(piece)
+            current_ids.extend(separator_ids)
+            current_ids.extend(ids)
+        else:
+            current_pieces = [piece] if piece else []
+            current_ids = list(ids)
+    
+    # Add the final chunk if it's not empty
+    if current_pieces:
+        chunks.append(make_chunk("".join(current_pieces), context))
+    
+    return chunks
+
+def _chunk_pieces(
+    pieces: List[Tuple[str, Optional[str]]],
+    separator: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    metadata: Optional[Dict[str, Any]],
+    context_key: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    Tokenize the pieces of a single document and pack them into chunks.
+    """
+    if metadata is None:
+        metadata = {}
+    
+    # Documents small enough to be a single chunk are never tokenized
+    if _fits_in_one_chunk(pieces, separator, chunk_size):
+        piece_ids = [[] for _ in pieces]
+    else:
+        encoder = _get_encoder()
+        piece_ids = [encoder.encode_ordinary(piece) for piece, _ in pieces]
+    
+    return _assemble_chunks(pieces, piece_ids, separator, chunk_size, chunk_overlap, metadata, context_key)
 
 def chunk_text(
     text: str,
@@ -125,69 +424,193 @@ def chunk_text(
     Returns:
         A list of dictionaries containing the chunks and their metadata
     """
-    if metadata is None:
-        metadata = {}
+    splitter, separator, context_key = _get_splitter(file_type)
+    return _chunk_pieces(splitter(text), separator, chunk_size, chunk_overlap, metadata, context_key)
+
+def chunk_documents(
+    documents: List[Dict[str, Any]],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> List[Dict[str, Any]]:
+    """
+    Split many documents into chunks, tokenizing all of their pieces in one batch.
     
-    # For markdown files, use the specialized markdown chunking
-    if file_type == "markdown":
-        return chunk_markdown(text, chunk_size, chunk_overlap, metadata)
+    Every document is split up front and the pieces are encoded together with
+    tiktoken's multithreaded batch encoder, instead of one encode() call per piece.
+    Documents small enough to be a single chunk are not tokenized at all.
     
-    # For code files, try to split by functions/classes
-    if file_type in ["python", "javascript", "typescript", "java", "cpp", "c", "go", "rust"]:
-        return chunk_code(text, chunk_size, chunk_overlap, metadata, file_type)
+    Args:
+        documents: Dictionaries with "content", and optionally "metadata" and "file_type"
+        chunk_size: The maximum number of tokens per chunk
+        chunk_overlap: The number of tokens to overlap between chunks
+        
+    Returns:
+        A list of dictionaries containing the chunks of all documents, in order
+    """
+    # Split every document into pieces
+    splits = []
+    all_pieces = []
+    for doc in documents:
+        splitter, separator, context_key = _get_splitter(doc.get("file_type", "text"))
+        pieces = splitter(doc["content"])
+        fits = _fits_in_one_chunk(pieces, separator, chunk_size)
+        splits.append((pieces, separator, context_key, doc.get("metadata") or {}, fits))
+        if not fits:
+            all_pieces.extend(piece for piece, _ in pieces)
     
-    # For other text files, use simple paragraph-based chunking
-    return chunk_simple_text(text, chunk_size, chunk_overlap, metadata)
+    # Tokenize all pieces in a single batched call
+    encoder = _get_encoder()
+    all_tokens = encoder.encode_ordinary_batch(all_pieces, num_threads=os.cpu_count() or 1)
+    
+    # Reassemble each document from its slice of the token ids
+    chunks = []
+    start = 0
+    for pieces, separator, context_key, metadata, fits in splits:
+        if fits:
+            piece_ids = [[] for _ in pieces]
+        else:
+            piece_ids = all_tokens[start:start + len(pieces)]
+            start += len(pieces)
+        chunks.extend(_assemble_chunks(pieces, piece_ids, separator, chunk_size, chunk_overlap, metadata, context_key))
+    
+    return chunks
 
-def chunk_simple_text(
-    text: str,
+def _read_text(file_path: str) -> str:
+    """
+    Read a UTF-8 text file with a single read call.
+    
+    Unbuffered binary reads skip the text layer's incremental decoding;
+    newlines are translated to "\n" afterwards, as text mode would. Files
+    of MMAP_MIN_BYTES or more are memory-mapped and decoded straight from
+    the mapping, without first copying them into a bytes object.
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content = str(mapped, "utf-8")
+        else:
+            content = f.readall().decode("utf-8")
+    
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+def _chunk_file(
+    file_path: str,
+    docs_dir: Optional[str] = None,
     chunk_size: int = 1000,
-    chunk_overlap: int = 200,
-    metadata: Optional[Dict[str, Any]] = None
+    chunk_overlap: int = 200
 ) -> List[Dict[str, Any]]:
     """
-    Split plain text into chunks based on paragraphs and token limits.
+    Read a file and split it into chunks according to its file type.
     """
-    if metadata is None:
-        metadata = {}
+    # Get relative path for metadata
+    rel_path = os.path.relpath(file_path, docs_dir) if docs_dir else file_path
     
-    # Split text into paragraphs
-    paragraphs = re.split(r'\n\s*\n', text.strip())
+    # Determine file type
+    file_type = get_file_type(file_path)
     
-    chunks = []
-    current_chunk = ""
+    try:
+        # Read the file
+        content = _read_text(file_path)
+    except Exception as e:
+        print(f"  Error processing {rel_path}: {e}")
+        return []
     
-    for paragraph in paragraphs:
-        paragraph = paragraph.strip()
-        if not paragraph:
-            continue
+    # Create metadata
+    metadata = {
+        "source": rel_path,
+        "file_path": file_path,
+        "file_type": file_type
+    }
+    
+    return chunk_text(content, chunk_size, chunk_overlap, metadata, file_type)
+
+def iter_file_chunks(
+    files: List[str],
+    workers: Optional[int] = None,
+    docs_dir: Optional[str] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Read and chunk many files in parallel using a pool of processes, yielding
+    the chunks of each file as soon as it is done.
+    
+    Args:
+        files: The paths of the files to chunk
+        workers: The number of worker processes (defaults to the number of CPUs)
+        docs_dir: The directory that "source" metadata paths are relative to
+        chunk_size: The maximum number of tokens per chunk
+        chunk_overlap: The number of tokens to overlap between chunks
         
-        # Check if adding this paragraph would exceed the chunk size
-        combined = current_chunk + "\n\n" + paragraph if current_chunk else paragraph
-        if get_token_count(combined) > chunk_size and current_chunk:
-            # Save the current chunk
-            chunk_metadata = metadata.copy()
-            chunks.append({
-                "content": current_chunk,
-                "metadata": chunk_metadata
-            })
-            
-            # Start a new chunk with overlap
-            words = current_chunk.split()
-            overlap_text = " ".join(words[-chunk_overlap:]) if len(words) > chunk_overlap else current_chunk
-            current_chunk = overlap_text + "\n\n" + paragraph
-        else:
-            current_chunk = combined
+    Returns:
+        An iterator over the lists of chunks of each file, in order, with an
+        empty list for files that could not be read
+    """
+    if not files:
+        return
     
-    # Add the final chunk if it's not empty
-    if current_chunk:
-        chunk_metadata = metadata.copy()
-        chunks.append({
-            "content": current_chunk,
-            "metadata": chunk_metadata
-        })
+    workers = workers or os.cpu_count() or 1
+    task = partial(_chunk_file, docs_dir=docs_dir, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     
-    return chunks
+    # Each worker builds its tokenizer once up front; files are sent in
+    # batches, and a plain Pool avoids the per-task bookkeeping of futures.
+    # Workers are not forked from this process, whose other threads (such as
+    # an event loop's) may hold locks that a forked child would inherit held
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    with context.Pool(processes=workers, initializer=_get_encoder) as pool:
+        yield from pool.imap(task, files, chunksize=max(1, len(files) // (workers * 4)))
+
+def iter_chunks(
+    files: List[str],
+    workers: Optional[int] = None,
+    docs_dir: Optional[str] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read and chunk many files in parallel using a pool of processes, yielding
+    the chunks of each file as soon as it is done.
+    
+    Returns:
+        An iterator over dictionaries containing the chunks of all files, in order
+    """
+    for chunks in iter_file_chunks(files, workers, docs_dir, chunk_size, chunk_overlap):
+        yield from chunks
+
+def chunk_all(
+    files: List[str],
+    workers: Optional[int] = None,
+    docs_dir: Optional[str] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> List[Dict[str, Any]]:
+    """
+    Read and chunk many files in parallel using a pool of processes.
+    
+    Args:
+        files: The paths of the files to chunk
+        workers: The number of worker processes (defaults to the number of CPUs)
+        docs_dir: The directory that "source" metadata paths are relative to
+        chunk_size: The maximum number of tokens per chunk
+        chunk_overlap: The number of tokens to overlap between chunks
+        
+    Returns:
+        A list of dictionaries containing the chunks of all files, in order
+    """
+    return list(iter_chunks(files, workers, docs_dir, chunk_size, chunk_overlap))
+
+def chunk_simple_text(
+    text: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    metadata: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Split plain text into chunks based on paragraphs and token limits.
+    """
+    return _chunk_pieces(_split_simple_text(text), "\n\n", chunk_size, chunk_overlap, metadata, None)
 
 def chunk_code(
     code: str,
@@ -199,86 +622,7 @@ def chunk_code(
     """
     Split code into chunks based on functions, classes, and other logical units.
     """
-    if metadata is None:
-        metadata = {}
-    
-    # Define patterns for different languages
-    patterns = {
-        "python": {
-            "function": r'def\s+\w+\s*\([^)]*\)\s*:',
-            "class": r'class\s+\w+',
-            "import": r'^(import|from)\s+',
-            "comment": r'^\s*#'
-        },
-        "javascript": {
-            "function": r'(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|let\s+\w+\s*=\s*\([^)]*\)\s*=>)',
-            "class": r'class\s+\w+',
-            "import": r'^(import|export)\s+',
-            "comment": r'^\s*//'
-        },
-        "typescript": {
-            "function": r'(function\s+\w+|const\s+\w+\s*:\s*[^=]*=\s*\([^)]*\)\s*=>|let\s+\w+\s*:\s*[^=]*=\s*\([^)]*\)\s*=>)',
-            "class": r'class\s+\w+',
-            "import": r'^(import|export)\s+',
-            "comment": r'^\s*//'
-        },
-        "java": {
-            "function": r'(public|private|protected)?\s*(static\s+)?\w+\s+\w+\s*\([^)]*\)\s*{',
-            "class": r'(public\s+)?class\s+\w+',
-            "import": r'^import\s+',
-            "comment": r'^\s*//'
-        }
-    }
-    
-    pattern = patterns.get(language, patterns["python"])
-    
-    # Split code into lines
-    lines = code.split('\n')
-    
-    chunks = []
-    current_chunk = ""
-    current_context = ""
-    
-    for line in lines:
-        # Check for function/class definitions
-        if re.search(pattern["function"], line):
-            current_context = f"Function: {line.strip()}"
-        elif re.search(pattern["class"], line):
-            current_context = f"Class: {line.strip()}"
-        elif re.search(pattern["import"], line):
-            current_context = f"Import: {line.strip()}"
-        
-        # Check if adding this line would exceed the chunk size
-        combined = current_chunk + "\n" + line if current_chunk else line
-        if get_token_count(combined) > chunk_size and current_chunk:
-            # Save the current chunk
-            chunk_metadata = metadata.copy()
-            if current_context:
-                chunk_metadata["code_context"] = current_context
-            chunks.append({
-                "content": current_chunk,
-                "metadata": chunk_metadata
-            })
-            
-            # Start a new chunk with overlap
-            lines_list = current_chunk.split('\n')
-            overlap_lines = lines_list[-chunk_overlap:] if len(lines_list) > chunk_overlap else lines_list
-            overlap_text = '\n'.join(overlap_lines)
-            current_chunk = overlap_text + "\n" + line
-        else:
-            current_chunk = combined
-    
-    # Add the final chunk if it's not empty
-    if current_chunk:
-        chunk_metadata = metadata.copy()
-        if current_context:
-            chunk_metadata["code_context"] = current_context
-        chunks.append({
-            "content": current_chunk,
-            "metadata": chunk_metadata
-        })
-    
-    return chunks
+    return _chunk_pieces(_split_code(code, language), "\n", chunk_size, chunk_overlap, metadata, "code_context")
 
 def chunk_markdown(
     markdown_text: str,
@@ -298,61 +642,4 @@ def chunk_markdown(
     Returns:
         A list of dictionaries containing the chunks and their metadata
     """
-    if metadata is None:
-        metadata = {}
-    
-    # Split the text into sections based on headers
-    sections = re.split(r'(#{1,6}\s+[^\n]+)', markdown_text)
-    
-    # Initialize chunks
-    chunks = []
-    current_chunk = ""
-    current_headers = []
-    
-    for i, section in enumerate(sections):
-        # Check if this is a header
-        if i % 2 == 1:  # Headers are at odd indices
-            header = section.strip()
-            header_level = len(re.match(r'^(#+)', header).group(1))
-            
-            # Remove headers of higher level (deeper nesting)
-            current_headers = [h for h in current_headers if h[0] < header_level]
-            current_headers.append((header_level, header))
-        else:
-            # This is content
-            content = section.strip()
-            if not content:
-                continue
-                
-            # Get the current header context
-            header_context = " > ".join([h[1] for h in current_headers])
-            
-            # Check if adding this content would exceed the chunk size
-            combined = current_chunk + "\n\n" + content if current_chunk else content
-            if get_token_count(combined) > chunk_size and current_chunk:
-                # Save the current chunk
-                chunk_metadata = metadata.copy()
-                chunk_metadata["header_context"] = header_context
-                chunks.append({
-                    "content": current_chunk,
-                    "metadata": chunk_metadata
-                })
-                
-                # Start a new chunk with overlap
-                words = current_chunk.split()
-                overlap_text = " ".join(words[-chunk_overlap:]) if len(words) > chunk_overlap else current_chunk
-                current_chunk = overlap_text + "\n\n" + content
-            else:
-                current_chunk = combined
-    
-    # Add the final chunk if it's not empty
-    if current_chunk:
-        header_context = " > ".join([h[1] for h in current_headers])
-        chunk_metadata = metadata.copy()
-        chunk_metadata["header_context"] = header_context
-        chunks.append({
-            "content": current_chunk,
-            "metadata": chunk_metadata
-        })
-    
-    return chunks
\ No newline at end of file
+    return _chunk_pieces(_split_markdown(markdown_text), "\n\n", chunk_size, chunk_overlap, metadata, "header_context")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from functools import lru_cache
+from openai import OpenAI, AsyncOpenAI
+
+@lru_cache(maxsize=1)
+def get_client() -> OpenAI:
+    """
+    Get the OpenAI client shared by embeddings and completions, so every request
+    reuses the same connection pool.
+    
+    The client reads OPENAI_API_KEY itself, and is created on first use rather
+    than at import time so that importing the app does not require the key.
+    """
+    return OpenAI()
+
+@lru_cache(maxsize=1)
+def get_async_client() -> AsyncOpenAI:
+    """
+    Get the shared async OpenAI client.
+    """
+    return AsyncOpenAI()
\ No newline at end of file
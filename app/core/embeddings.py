@@ -1,57 +1,366 @@
 import os
-from typing import List, Dict, Any
+import base64
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
-from openai import OpenAI
+
+from app.core.cache import LRUCache
+from app.core.clients import get_client, get_async_client
+from app.core.chunking import get_token_counts
 
 # Get the embedding model from environment variables
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = 1536  # Default for text-embedding-3-small
+
+# Limits for a single embeddings request, kept below the API's maximums
+MAX_BATCH_INPUTS = 256
+MAX_BATCH_TOKENS = 200000
+
+# Embeddings of recently seen texts, keyed by a hash of the model and text
+EMBEDDING_CACHE_SIZE = 10000
+_embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+
+# Every embedding ever generated, in an SQLite database behind the in-memory
+# cache, once open_embedding_cache() has been called; only the ingest script
+# opens it, so query embeddings do not accumulate on disk
+_disk_cache: Optional[sqlite3.Connection] = None
+_disk_cache_lock = threading.Lock()
 
-def get_embeddings(texts: List[str]) -> List[List[float]]:
+# The number of keys looked up in the database per query
+DISK_CACHE_LOOKUP_SIZE = 500
+
+def _fits_in_one_request(texts: List[str]) -> bool:
     """
-    Generate embeddings for a list of texts using OpenAI's API.
+    Check, without tokenizing, whether texts certainly fit in one embeddings request.
+    
+    Every token covers at least one byte of UTF-8, so texts of at most
+    MAX_BATCH_TOKENS bytes in total can never be more tokens than that.
+    """
+    # A single text, such as a query, is always sent on its own
+    if len(texts) == 1:
+        return True
+    if len(texts) > MAX_BATCH_INPUTS:
+        return False
+    
+    # Characters never outnumber bytes, so long inputs are ruled out before encoding
+    if sum(len(text) for text in texts) > MAX_BATCH_TOKENS:
+        return False
+    return sum(len(text.encode("utf-8")) for text in texts) <= MAX_BATCH_TOKENS
+
+def _make_batches(texts: List[str]) -> List[List[int]]:
+    """
+    Split texts into batches that fit within a single embeddings request.
     
     Args:
         texts: A list of text strings to generate embeddings for
         
     Returns:
-        A list of embedding vectors
+        A list of batches of indexes into texts, in order
     """
-    if not texts:
-        return []
+    if _fits_in_one_request(texts):
+        return [list(range(len(texts)))]
     
-    # Initialize OpenAI client inside the function with minimal parameters
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    client = OpenAI()
-    client.api_key = api_key
+    batches = []
+    batch = []
+    batch_tokens = 0
     
-    # Call OpenAI API to get embeddings
-    response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=texts,
-        dimensions=1536  # Default for text-embedding-3-small
-    )
+    for i, tokens in enumerate(get_token_counts(texts)):
+        if batch and (len(batch) >= MAX_BATCH_INPUTS or batch_tokens + tokens > MAX_BATCH_TOKENS):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        
+        batch.append(i)
+        batch_tokens += tokens
+    
+    if batch:
+        batches.append(batch)
+    
+    return batches
+
+def _cache_key(text: str) -> bytes:
+    """
+    Get the embedding cache key for a text.
+    """
+    return hashlib.blake2b(f"{EMBEDDING_MODEL}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+def _get_disk_cached(keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+    """
+    Look keys up in the on-disk embedding cache.
+    
+    Returns:
+        The cached embeddings, as read-only float32 arrays, of the keys that were found
+    """
+    found = {}
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            return found
+        
+        for i in range(0, len(keys), DISK_CACHE_LOOKUP_SIZE):
+            batch = keys[i:i+DISK_CACHE_LOOKUP_SIZE]
+            rows = _disk_cache.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            # Arrays over the returned bytes objects are read-only already
+            found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+    
+    return found
+
+def _get_cached(texts: List[str]) -> Tuple[List[bytes], List[Optional[np.ndarray]], List[int]]:
+    """
+    Look texts up in the in-memory embedding cache, then in the on-disk one.
+    
+    Returns:
+        The cache keys, the cached embeddings (None for misses) and the indexes of the misses
+    """
+    keys = [_cache_key(text) for text in texts]
+    embeddings = [_embedding_cache.get(key) for key in keys]
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
     
-    # Extract embeddings from response
-    embeddings = [item.embedding for item in response.data]
+    if misses:
+        found = _get_disk_cached([keys[i] for i in misses])
+        for i in misses:
+            embeddings[i] = found.get(keys[i])
+            if embeddings[i] is not None:
+                _embedding_cache.put(keys[i], embeddings[i])
+        misses = [i for i in misses if embeddings[i] is None]
+    
+    return keys, embeddings, misses
+
+def _fill_cache(
+    keys: List[bytes],
+    embeddings: List[Optional[np.ndarray]],
+    misses: List[int],
+    new_embeddings: np.ndarray
+) -> List[np.ndarray]:
+    """
+    Store newly generated embeddings in the caches and merge them with the hits.
+    
+    Returns:
+        The embedding vectors of all texts as read-only float32 arrays, in order
+    """
+    # Cached rows are handed out directly, so they must not be modified
+    new_embeddings.flags.writeable = False
+    for i, embedding in zip(misses, new_embeddings):
+        embeddings[i] = embedding
+        _embedding_cache.put(keys[i], embedding)
+    
+    with _disk_cache_lock:
+        if _disk_cache is not None and misses:
+            with _disk_cache:
+                _disk_cache.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[i], embeddings[i].tobytes()) for i in misses]
+                )
+    
+    return embeddings
+
+def _embed(texts: List[str]) -> List[np.ndarray]:
+    """
+    Generate embeddings for texts, serving recently embedded ones from the cache.
+    """
+    keys, embeddings, misses = _get_cached(texts)
+    if not misses:
+        return embeddings
+    
+    new_embeddings = _request_embeddings([texts[i] for i in misses])
+    return _fill_cache(keys, embeddings, misses, new_embeddings)
+
+async def _aembed(texts: List[str]) -> List[np.ndarray]:
+    """
+    Generate embeddings for texts asynchronously, serving recently embedded ones from the cache.
+    """
+    # The on-disk cache is read and written in a thread, off the event loop
+    keys, embeddings, misses = await asyncio.to_thread(_get_cached, texts)
+    if not misses:
+        return embeddings
+    
+    new_embeddings = await _arequest_embeddings([texts[i] for i in misses])
+    return await asyncio.to_thread(_fill_cache, keys, embeddings, misses, new_embeddings)
+
+def _decode_response(embeddings: np.ndarray, batch: List[int], response: Any):
+    """
+    Decode the base64 embeddings of a response into their rows of a matrix.
+    
+    Asking the API for base64 skips converting every value into a Python
+    float; the bytes are little-endian float32 values.
+    """
+    for i, item in zip(batch, response.data):
+        embeddings[i] = np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+
+def _request_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Request embeddings from OpenAI's API, one request per batch.
+    """
+    client = get_client()
+    
+    embeddings = np.empty((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for batch in _make_batches(texts):
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[texts[i] for i in batch],
+            dimensions=EMBEDDING_DIMENSIONS,
+            encoding_format="base64"
+        )
+        
+        # Extract embeddings from response, back in the order of the texts
+        _decode_response(embeddings, batch, response)
     
     return embeddings
 
-def get_embedding(text: str) -> List[float]:
+async def _arequest_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Request embeddings from OpenAI's API with every batch in flight at once.
+    """
+    client = get_async_client()
+    
+    # Texts that may need several requests are tokenized in a thread, off the event loop
+    if _fits_in_one_request(texts):
+        batches = [list(range(len(texts)))]
+    else:
+        batches = await asyncio.to_thread(_make_batches, texts)
+    responses = await asyncio.gather(*[
+        client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[texts[i] for i in batch],
+            dimensions=EMBEDDING_DIMENSIONS,
+            encoding_format="base64"
+        )
+        for batch in batches
+    ])
+    
+    # Extract embeddings from the responses, back in the order of the texts
+    embeddings = np.empty((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for batch, response in zip(batches, responses):
+        _decode_response(embeddings, batch, response)
+    
+    return embeddings
+
+def _to_matrix(embeddings: List[np.ndarray]) -> np.ndarray:
+    """
+    Stack embedding vectors into a float32 matrix, one row per vector.
+    """
+    if not embeddings:
+        return np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    
+    return np.stack(embeddings)
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Generate embeddings for a list of texts using OpenAI's API.
+    
+    Texts that were embedded recently are served from an in-memory cache.
+    
+    Args:
+        texts: A list of text strings to generate embeddings for
+        
+    Returns:
+        A float32 matrix with one embedding vector per text, ready to be
+        passed to the vector store
+    """
+    return _to_matrix(_embed(texts) if texts else [])
+
+async def aget_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Generate embeddings for a list of texts, sending all batches concurrently.
+    
+    Texts that were embedded recently are served from an in-memory cache.
+    
+    Args:
+        texts: A list of text strings to generate embeddings for
+        
+    Returns:
+        A float32 matrix with one embedding vector per text
+    """
+    return _to_matrix(await _aembed(texts) if texts else [])
+
+def _embedding_cache_path() -> str:
+    """
+    Get the path of the on-disk embedding cache.
+    """
+    return os.path.join(os.getenv("VECTOR_DB_PATH", "./vector_db"), "embed_cache.db")
+
+def open_embedding_cache(path: Optional[str] = None) -> bool:
+    """
+    Open the on-disk embedding cache, so that embeddings survive restarts and
+    unchanged texts are never embedded twice.
+    
+    Args:
+        path: The SQLite database to use, defaulting to embed_cache.db in VECTOR_DB_PATH
+        
+    Returns:
+        True if the cache was opened successfully, False otherwise
+    """
+    global _disk_cache
+    
+    if path is None:
+        path = _embedding_cache_path()
+    
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # The connection is shared by the server's threads, guarded by _disk_cache_lock
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+    except sqlite3.Error as e:
+        print(f"Error opening embedding cache: {e}")
+        return False
+    
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+        _disk_cache = connection
+    return True
+
+def close_embedding_cache():
+    """
+    Close the on-disk embedding cache.
+    """
+    global _disk_cache
+    
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+            _disk_cache = None
+
+def get_embedding(text: str) -> np.ndarray:
     """
     Generate an embedding for a single text using OpenAI's API.
     
+    The vector is returned as a float32 array, ready to be passed to the
+    vector store without converting it to a list and back.
+    
+    Args:
+        text: The text to generate an embedding for
+        
+    Returns:
+        A read-only float32 embedding vector
+    """
+    return _embed([text])[0]
+
+async def aget_embedding(text: str) -> np.ndarray:
+    """
+    Generate an embedding for a single text using the async client.
+    
     Args:
         text: The text to generate an embedding for
         
     Returns:
-        An embedding vector
+        A read-only float32 embedding vector
     """
-    embeddings = get_embeddings([text])
-    return embeddings[0] if embeddings else []
+    return (await _aembed([text]))[0]
 
 def cosine_similarity(a: List[float], b: List[float]) -> float:
     """
-    Calculate the cosine similarity between two vectors.
+    Calculate the cosine similarity between two unit-length vectors.
+    
+    OpenAI embeddings are normalized to length 1, so the cosine similarity
+    reduces to a dot product.
     
     Args:
         a: First vector
@@ -60,7 +369,4 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
     Returns:
         The cosine similarity between the vectors
     """
-    a_np = np.array(a)
-    b_np = np.array(b)
-    
-    return np.dot(a_np, b_np) / (np.linalg.norm(a_np) * np.linalg.norm(b_np))
\ No newline at end of file
+    return float(np.dot(a, b))
\ No newline at end of file
@@ -1,29 +1,36 @@
 import os
-from typing import List, Dict, Any
-from openai import OpenAI
+import json
+import asyncio
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-from app.core.embeddings import get_embedding
+from app.core.cache import LRUCache
+from app.core.clients import get_client, get_async_client
+from app.core.embeddings import get_embedding, aget_embedding
 from app.db.vector_store import FAISSVectorStore
 
 # Get the completion model from environment variables
 COMPLETION_MODEL = os.getenv("COMPLETION_MODEL", "gpt-4o")
 
+# How many candidates to rescore with full-precision vectors per requested
+# result; 0 turns reranking off. The vectors are only kept by stores built
+# with RERANK_FACTOR set
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", "0"))
+
 # Initialize vector store
-vector_store = FAISSVectorStore()
+vector_store = FAISSVectorStore(rerank=RERANK_FACTOR > 0, rerank_factor=max(RERANK_FACTOR, 1))
 
 # Load vector store if it exists
 vector_store.load()
 
-def query_documentation(query: str, top_k: int = 5) -> Dict[str, Any]:
+# Answers to recently asked questions, keyed by (query, top_k)
+_query_cache = LRUCache(maxsize=256)
+
+def _retrieve(query: str, top_k: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Query the documentation with a natural language question.
+    Find the documentation chunks most relevant to a question.
     
-    Args:
-        query: The natural language question
-        top_k: The number of most relevant chunks to retrieve
-        
     Returns:
-        A dictionary containing the answer and the sources
+        The relevant chunks, and an answer to give instead if there are none
     """
     try:
         # Generate embedding for the query
@@ -33,23 +40,38 @@ def query_documentation(query: str, top_k: int = 5) -> Dict[str, Any]:
         relevant_chunks = vector_store.search(query_embedding, top_k=top_k)
         
         if not relevant_chunks:
-            return {
-                "answer": "I couldn't find any relevant information in the documentation. Please try rephrasing your question.",
-                "sources": []
-            }
+            return [], "I couldn't find any relevant information in the documentation. Please try rephrasing your question."
     except Exception as e:
-        return {
-            "answer": f"The vector database is not yet initialized or there was an error: {str(e)}. Please run the vectorization process first.",
-            "sources": []
-        }
+        return [], f"The vector database is not yet initialized or there was an error: {str(e)}. Please run the vectorization process first."
     
-    # Prepare context for the completion
-    context = "\n\n".join([
-        f"Source {i+1}: {chunk['content']}"
-        for i, chunk in enumerate(relevant_chunks)
-    ])
+    return relevant_chunks, None
+
+async def _aretrieve(query: str, top_k: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Find the documentation chunks most relevant to a question, embedding it asynchronously.
+    
+    Returns:
+        The relevant chunks, and an answer to give instead if there are none
+    """
+    try:
+        # Generate embedding for the query
+        query_embedding = await aget_embedding(query)
+        
+        # Search for relevant chunks in a thread, so that a slow search does not
+        # hold up the other requests on the event loop
+        relevant_chunks = await asyncio.to_thread(vector_store.search, query_embedding, top_k=top_k)
+        
+        if not relevant_chunks:
+            return [], "I couldn't find any relevant information in the documentation. Please try rephrasing your question."
+    except Exception as e:
+        return [], f"The vector database is not yet initialized or there was an error: {str(e)}. Please run the vectorization process first."
     
-    # Prepare sources for the response
+    return relevant_chunks, None
+
+def _format_sources(relevant_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Prepare the retrieved chunks for the response, truncating their content.
+    """
     sources = []
     for chunk in relevant_chunks:
         source = {
@@ -59,7 +81,18 @@ def query_documentation(query: str, top_k: int = 5) -> Dict[str, Any]:
         }
         sources.append(source)
     
-    # Generate completion
+    return sources
+
+def _build_messages(query: str, relevant_chunks: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Build the chat completion messages for a question and its relevant chunks.
+    """
+    # Prepare context for the completion
+    context = "\n\n".join([
+        f"Source {i+1}: {chunk['content']}"
+        for i, chunk in enumerate(relevant_chunks)
+    ])
+    
     prompt = f"""
 You are an API documentation assistant. Answer the following question based on the provided documentation chunks.
 If the answer is not contained in the documentation, say "I don't know" or "I couldn't find information about that in the documentation."
@@ -73,24 +106,129 @@ Question: {query}
 Answer:
 """
     
-    # Initialize OpenAI client inside the function with minimal parameters
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    client = OpenAI()
-    client.api_key = api_key
+    return [
+        {"role": "system", "content": "You are an API documentation assistant that provides accurate, helpful answers based solely on the provided documentation."},
+        {"role": "user", "content": prompt}
+    ]
+
+def query_documentation(query: str, top_k: int = 5) -> Dict[str, Any]:
+    """
+    Query the documentation with a natural language question.
     
-    response = client.chat.completions.create(
+    Args:
+        query: The natural language question
+        top_k: The number of most relevant chunks to retrieve
+        
+    Returns:
+        A dictionary containing the answer and the sources
+    """
+    cached = _query_cache.get((query, top_k))
+    if cached is not None:
+        return cached
+    
+    relevant_chunks, fallback_answer = _retrieve(query, top_k)
+    if fallback_answer is not None:
+        return {
+            "answer": fallback_answer,
+            "sources": []
+        }
+    
+    # Generate completion
+    response = get_client().chat.completions.create(
         model=COMPLETION_MODEL,
-        messages=[
-            {"role": "system", "content": "You are an API documentation assistant that provides accurate, helpful answers based solely on the provided documentation."},
-            {"role": "user", "content": prompt}
-        ],
+        messages=_build_messages(query, relevant_chunks),
         temperature=0.1,
         max_tokens=1000
     )
     
     answer = response.choices[0].message.content.strip()
     
-    return {
+    result = {
         "answer": answer,
-        "sources": sources
-    }
\ No newline at end of file
+        "sources": _format_sources(relevant_chunks)
+    }
+    _query_cache.put((query, top_k), result)
+    
+    return result
+
+async def query_documentation_async(query: str, top_k: int = 5) -> Dict[str, Any]:
+    """
+    Query the documentation with a natural language question without blocking the event loop.
+    
+    Args:
+        query: The natural language question
+        top_k: The number of most relevant chunks to retrieve
+        
+    Returns:
+        A dictionary containing the answer and the sources
+    """
+    cached = _query_cache.get((query, top_k))
+    if cached is not None:
+        return cached
+    
+    relevant_chunks, fallback_answer = await _aretrieve(query, top_k)
+    if fallback_answer is not None:
+        return {
+            "answer": fallback_answer,
+            "sources": []
+        }
+    
+    # Generate completion
+    response = await get_async_client().chat.completions.create(
+        model=COMPLETION_MODEL,
+        messages=_build_messages(query, relevant_chunks),
+        temperature=0.1,
+        max_tokens=1000
+    )
+    
+    answer = response.choices[0].message.content.strip()
+    
+    result = {
+        "answer": answer,
+        "sources": _format_sources(relevant_chunks)
+    }
+    _query_cache.put((query, top_k), result)
+    
+    return result
+
+def _sse_event(data: Any, event: Optional[str] = None) -> str:
+    """
+    Format a server-sent event with a JSON payload.
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def query_documentation_stream(query: str, top_k: int = 5) -> Iterator[str]:
+    """
+    Query the documentation, streaming the answer as server-sent events.
+    
+    A "sources" event with the retrieved sources is sent first, followed by
+    one unnamed event per piece of the answer as it is generated, and a final
+    "done" event.
+    
+    Args:
+        query: The natural language question
+        top_k: The number of most relevant chunks to retrieve
+        
+    Yields:
+        Server-sent event strings
+    """
+    relevant_chunks, fallback_answer = _retrieve(query, top_k)
+    yield _sse_event(_format_sources(relevant_chunks), event="sources")
+    
+    if fallback_answer is not None:
+        yield _sse_event(fallback_answer)
+    else:
+        stream = get_client().chat.completions.create(
+            model=COMPLETION_MODEL,
+            messages=_build_messages(query, relevant_chunks),
+            temperature=0.1,
+            max_tokens=1000,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield _sse_event(chunk.choices[0].delta.content)
+    
+    yield _sse_event({}, event="done")
\ No newline at end of file
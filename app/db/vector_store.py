@@ -1,36 +1,202 @@
 import os
-import json
 import faiss
+import orjson
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 import pickle
 
+try:
+    import numba
+except ImportError:
+    # Reranking falls back to numpy when numba is not installed
+    numba = None
+
+# Scalar quantizers that store each vector dimension in less than a float32
+VECTOR_DTYPES = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit
+}
+
+# Training on a GPU only pays for copying the index there and back from this many vectors
+GPU_TRAINING_MIN_VECTORS = 10000
+
+# Documents are appended to a log on save and folded into the Arrow snapshot once
+# the log outgrows the snapshot (or this many documents), keeping saves O(batch)
+SNAPSHOT_MIN_DOCUMENTS = 10000
+
+def _binarize(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Pack the sign bits of float embeddings into the byte codes used by binary indexes.
+    """
+    return np.packbits(embeddings > 0, axis=1)
+
+def _gpu_available() -> bool:
+    """
+    Check whether FAISS was built with GPU support and can see a GPU.
+    """
+    return hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0
+
+def _documents_to_table(ids: np.ndarray, contents: List[str], metadata: List[Dict[str, Any]]) -> pa.Table:
+    """
+    Convert document columns to an Arrow table with id, content and metadata columns.
+    
+    Metadata is stored as JSON and dictionary-encoded, since chunks of the same
+    file share most of it.
+    """
+    return pa.table({
+        "id": pa.array(ids, type=pa.int64()),
+        "content": pa.array(contents, type=pa.string()),
+        "metadata": pa.array([orjson.dumps(meta).decode("utf-8") for meta in metadata], type=pa.string()).dictionary_encode()
+    })
+
+def _rerank_numpy(candidate_ids: np.ndarray, vectors: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rescore candidates against their full-precision vectors.
+    
+    Args:
+        candidate_ids: The candidate document ids returned by the index
+        vectors: The full-precision, normalized vectors of all documents
+        query: The normalized query vector
+        
+    Returns:
+        The candidate ids and their exact cosine similarities, best first
+    """
+    candidate_ids = candidate_ids[candidate_ids >= 0]
+    scores = vectors[candidate_ids] @ query
+    order = np.argsort(-scores)
+    return candidate_ids[order], scores[order]
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _rerank(candidate_ids, vectors, query):
+        """
+        Rescore candidates against their full-precision vectors in a compiled loop,
+        without gathering the candidate vectors into a temporary matrix.
+        """
+        ids = np.empty(candidate_ids.shape[0], dtype=np.int64)
+        scores = np.empty(candidate_ids.shape[0], dtype=np.float32)
+        count = 0
+        for i in range(candidate_ids.shape[0]):
+            idx = candidate_ids[i]
+            if idx < 0:
+                continue
+            
+            score = np.float32(0.0)
+            for j in range(query.shape[0]):
+                score += vectors[idx, j] * query[j]
+            ids[count] = idx
+            scores[count] = score
+            count += 1
+        
+        order = np.argsort(-scores[:count])
+        return ids[:count][order], scores[:count][order]
+else:
+    _rerank = _rerank_numpy
+
 class FAISSVectorStore:
     """
     A vector store implementation using FAISS for efficient similarity search.
     """
     
-    def __init__(self, dimension: int = 1536, index_type: str = "L2"):
+    def __init__(
+        self,
+        dimension: int = 1536,
+        index_type: str = "HNSW",
+        ef_search: int = 64,
+        nlist: int = 4096,
+        m: int = 64,
+        nbits: int = 8,
+        nprobe: int = 16,
+        rerank: bool = False,
+        rerank_factor: int = 4,
+        dtype: str = "float32",
+        use_gpu: bool = False
+    ):
         """
         Initialize the FAISS vector store.
         
+        Embeddings are L2-normalized on the way in, so the inner product of two
+        vectors is their cosine similarity.
+        
         Args:
             dimension: The dimension of the embedding vectors
-            index_type: The type of FAISS index to use (L2 or IP for inner product)
+            index_type: The type of FAISS index to use: HNSW (approximate graph search),
+                IVFPQ (compressed inverted lists for very large corpora), SQ8 (8-bit
+                scalar quantized vectors), BINARY (1 bit per dimension), or the exact
+                flat indexes IP (inner product) and L2 for small corpora
+            ef_search: The HNSW search depth; higher is more accurate but slower
+            nlist: The number of IVF clusters (IVFPQ only)
+            m: The number of PQ sub-quantizers per vector (IVFPQ only)
+            nbits: The number of bits per PQ sub-quantizer code (IVFPQ only)
+            nprobe: The number of IVF clusters visited per query (IVFPQ only)
+            rerank: Whether to keep full-precision vectors and use them to rescore
+                the candidates from a quantized index
+            rerank_factor: How many candidates to fetch per requested result when reranking
+            dtype: The precision the HNSW and exact IP/L2 indexes store vectors in:
+                float32, or float16 or int8 to halve or quarter their memory
+            use_gpu: Whether to train the index on a GPU, if faiss-gpu is installed
+                and one is available; the index itself stays on the CPU
         """
         self.dimension = dimension
         self.index_type = index_type
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.rerank_factor = rerank_factor
+        self.use_gpu = use_gpu and _gpu_available()
+        
+        # Full-precision vectors for reranking, kept as the batches that were added
+        self._vector_batches = []
+        
+        if dtype != "float32" and dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        quantizer_type = VECTOR_DTYPES.get(dtype)
         
         # Initialize FAISS index
-        if index_type == "L2":
+        if index_type == "HNSW":
+            if quantizer_type is None:
+                self.index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            else:
+                self.index = faiss.IndexHNSWSQ(dimension, quantizer_type, 32, faiss.METRIC_INNER_PRODUCT)
+            self.index.hnsw.efConstruction = 200
+        elif index_type == "IVFPQ":
+            quantizer = faiss.IndexFlatIP(dimension)
+            self.index = faiss.IndexIVFPQ(quantizer, dimension, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+        elif index_type == "SQ8":
+            self.index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        elif index_type == "BINARY":
+            self.index = faiss.IndexBinaryFlat(dimension)
+        elif index_type in ("L2", "IP") and quantizer_type is not None:
+            metric = faiss.METRIC_L2 if index_type == "L2" else faiss.METRIC_INNER_PRODUCT
+            self.index = faiss.IndexScalarQuantizer(dimension, quantizer_type, metric)
+        elif index_type == "L2":
             self.index = faiss.IndexFlatL2(dimension)
         elif index_type == "IP":
             self.index = faiss.IndexFlatIP(dimension)
         else:
             raise ValueError(f"Unsupported index type: {index_type}")
         
-        # Initialize document store
-        self.documents = []
+        # Store explicit document ids alongside the vectors
+        if isinstance(self.index, faiss.IndexBinary):
+            self.index = faiss.IndexBinaryIDMap2(self.index)
+        else:
+            self.index = faiss.IndexIDMap2(self.index)
+        
+        self._set_search_params()
+        
+        # Initialize document store: documents in the Arrow snapshot live in a
+        # memory-mapped table, later documents in parallel content and metadata
+        # lists. Document ids are positions, continuing from the table's rows
+        self._table = None
+        self._contents = []
+        self._metadata = []
+        
+        # The file the store was last saved to or loaded from, and how many of
+        # the listed documents are already in that file's append-only log
+        self._filename = None
+        self._logged = 0
         
         # Path to save the vector store
         self.vector_db_path = os.getenv("VECTOR_DB_PATH", "./vector_db")
@@ -38,33 +204,147 @@ class FAISSVectorStore:
         # Create the directory if it doesn't exist
         os.makedirs(self.vector_db_path, exist_ok=True)
     
-    def add_documents(self, documents: List[Dict[str, Any]], embeddings: List[List[float]]):
+    def _set_search_params(self):
+        """
+        Apply the query-time search parameters to the current index, if it has them.
+        """
+        if isinstance(self.index, faiss.IndexBinary):
+            return
+        
+        params = faiss.ParameterSpace()
+        for name, value in (("efSearch", self.ef_search), ("nprobe", self.nprobe)):
+            try:
+                params.set_index_parameter(self.index, name, value)
+            except RuntimeError:
+                # The index does not support this parameter
+                pass
+    
+    def __len__(self) -> int:
+        """
+        Get the number of documents in the store.
+        """
+        table_rows = self._table.num_rows if self._table is not None else 0
+        return table_rows + len(self._contents)
+    
+    def _get_documents(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Build the result dictionaries for the documents with the given ids.
+        
+        Args:
+            indices: The document ids, with -1 for missing results
+            scores: The score of each document
+            
+        Returns:
+            A list of documents with their id, content, metadata and score
+        """
+        table_rows = self._table.num_rows if self._table is not None else 0
+        hits = [(int(idx), float(score)) for idx, score in zip(indices, scores) if 0 <= idx < len(self)]
+        
+        # Only the requested rows are read from the memory-mapped table, in a single take
+        table_ids = [idx for idx, _ in hits if idx < table_rows]
+        rows = {}
+        if table_ids:
+            columns = self._table.take(pa.array(table_ids, type=pa.int64())).to_pydict()
+            rows = {
+                idx: (content, orjson.loads(metadata))
+                for idx, content, metadata in zip(table_ids, columns["content"], columns["metadata"])
+            }
+        
+        results = []
+        for idx, score in hits:
+            if idx < table_rows:
+                content, metadata = rows[idx]
+            else:
+                content, metadata = self._contents[idx - table_rows], self._metadata[idx - table_rows]
+            results.append({"id": idx, "content": content, "metadata": metadata, "score": score})
+        
+        return results
+    
+    def get_documents(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get documents by id.
+        
+        Args:
+            ids: The ids of the documents
+            
+        Returns:
+            The documents' content and metadata, in the order of the ids
+        """
+        documents = self._get_documents(np.asarray(ids, dtype=np.int64), np.zeros(len(ids)))
+        return [{"content": doc["content"], "metadata": doc["metadata"]} for doc in documents]
+    
+    def iter_metadata(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the metadata of all documents, in id order.
+        
+        Each distinct metadata value in the snapshot is decoded only once, so
+        the documents that share it also share the dictionary.
+        """
+        if self._table is not None:
+            for chunk in self._table.column("metadata").chunks:
+                if pa.types.is_dictionary(chunk.type):
+                    values = [orjson.loads(value) for value in chunk.dictionary.to_pylist()]
+                    yield from (values[i] for i in chunk.indices.to_numpy(zero_copy_only=False))
+                else:
+                    yield from (orjson.loads(value) for value in chunk.to_pylist())
+        
+        yield from self._metadata
+    
+    def add_documents(self, documents: List[Dict[str, Any]], embeddings: Union[np.ndarray, List[List[float]]]):
         """
         Add documents and their embeddings to the vector store.
         
         Args:
             documents: A list of document dictionaries
-            embeddings: A list of embedding vectors corresponding to the documents
+            embeddings: A matrix or list of embedding vectors corresponding to the documents
         """
-        if not documents or not embeddings:
+        if not documents or len(embeddings) == 0:
             return
         
         if len(documents) != len(embeddings):
             raise ValueError("Number of documents and embeddings must match")
         
-        # Convert embeddings to numpy array
-        embeddings_np = np.array(embeddings).astype('float32')
+        # Convert embeddings to a numpy array and normalize them for cosine similarity
+        embeddings_np = np.array(embeddings, dtype=np.float32)
+        faiss.normalize_L2(embeddings_np)
+        
+        # Binary indexes store only the sign bit of each dimension
+        index_embeddings = _binarize(embeddings_np) if isinstance(self.index, faiss.IndexBinary) else embeddings_np
         
-        # Add embeddings to FAISS index
-        self.index.add(embeddings_np)
+        # Indexes with learned structure (IVFPQ, SQ8) are trained on the first batch
+        if not self.index.is_trained:
+            self._train(index_embeddings)
+        
+        # Add embeddings to FAISS index under their document ids
+        start_idx = len(self)
+        ids = np.arange(start_idx, start_idx + len(documents), dtype=np.int64)
+        self.index.add_with_ids(index_embeddings, ids)
+        
+        if self.rerank:
+            self._vector_batches.append(embeddings_np)
         
         # Add documents to document store
-        start_idx = len(self.documents)
-        for i, doc in enumerate(documents):
-            doc["id"] = start_idx + i
-            self.documents.append(doc)
+        self._contents.extend(doc["content"] for doc in documents)
+        self._metadata.extend(doc.get("metadata", {}) for doc in documents)
     
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def _train(self, embeddings: np.ndarray):
+        """
+        Train the index, on the GPU if enabled and the batch is large enough to be worth it.
+        """
+        if self.use_gpu and len(embeddings) >= GPU_TRAINING_MIN_VECTORS and not isinstance(self.index, faiss.IndexBinary):
+            try:
+                gpu_index = faiss.index_cpu_to_gpu(faiss.StandardGpuResources(), 0, faiss.downcast_index(self.index.index))
+                gpu_index.train(embeddings)
+                self.index = faiss.IndexIDMap2(faiss.index_gpu_to_cpu(gpu_index))
+                self._set_search_params()
+                return
+            except RuntimeError:
+                # Not every index type has a GPU implementation
+                pass
+        
+        self.index.train(embeddings)
+    
+    def search(self, query_embedding: Union[np.ndarray, List[float]], top_k: int = 5) -> List[Dict[str, Any]]:
         """
         Search for the most similar documents to a query embedding.
         
@@ -73,31 +353,123 @@ class FAISSVectorStore:
             top_k: The number of results to return
             
         Returns:
-            A list of the most similar documents
+            A list of the most similar documents, with their cosine similarity as the score
         """
-        if not self.documents:
+        if not len(self):
             return []
         
-        # Convert query embedding to numpy array
-        query_embedding_np = np.array([query_embedding]).astype('float32')
+        # Copy the query embedding into a float32 row and normalize it; the copy is
+        # a single memcpy for float32 arrays, and keeps the caller's vector intact
+        query_embedding_np = np.array(query_embedding, dtype=np.float32, ndmin=2)
+        faiss.normalize_L2(query_embedding_np)
+        
+        # Fetch extra candidates from the index when they will be reranked
+        vectors = self._get_vectors() if self.rerank else None
+        k = top_k * self.rerank_factor if vectors is not None else top_k
+        scores, indices = self._search_index(query_embedding_np, min(k, len(self)))
         
-        # Search FAISS index
-        distances, indices = self.index.search(query_embedding_np, min(top_k, len(self.documents)))
+        if vectors is not None:
+            # Memory-mapped vectors are passed as a plain array view for the compiled reranker
+            indices, scores = _rerank(indices.astype(np.int64), np.asarray(vectors), query_embedding_np[0])
+            indices, scores = indices[:top_k], scores[:top_k]
         
         # Get the corresponding documents
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.documents):
-                doc = self.documents[idx].copy()
-                doc["score"] = float(distances[0][i])
-                results.append(doc)
+        return self._get_documents(indices, scores)
+    
+    def _search_index(self, query_embedding_np: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the FAISS index, converting its distances into cosine similarities.
         
-        return results
+        Returns:
+            The scores and document ids of the k nearest vectors
+        """
+        if isinstance(self.index, faiss.IndexBinary):
+            # Approximate the similarity by the fraction of matching sign bits
+            distances, indices = self.index.search(_binarize(query_embedding_np), k)
+            scores = 1.0 - 2.0 * distances[0] / self.index.d
+            return scores, indices[0]
+        
+        distances, indices = self.index.search(query_embedding_np, k)
+        
+        # For unit vectors the squared L2 distance is 2 - 2 * cosine similarity
+        scores = distances[0]
+        if self.index.metric_type == faiss.METRIC_L2:
+            scores = 1.0 - scores / 2.0
+        
+        return scores, indices[0]
+    
+    def _get_vectors(self) -> Optional[np.ndarray]:
+        """
+        Get the full-precision vectors of all documents as one matrix, if they are kept.
+        """
+        if not self._vector_batches:
+            return None
+        
+        if len(self._vector_batches) > 1:
+            self._vector_batches = [np.concatenate(self._vector_batches)]
+        
+        # Vectors only line up with document ids if every document has one
+        vectors = self._vector_batches[0]
+        return vectors if len(vectors) == len(self) else None
+    
+    def _get_paths(self, filename: str) -> Tuple[str, str, str, str]:
+        """
+        Get the index, snapshot, log and vectors paths for a filename.
+        """
+        return (
+            os.path.join(self.vector_db_path, f"{filename}.index"),
+            os.path.join(self.vector_db_path, f"{filename}.arrow"),
+            os.path.join(self.vector_db_path, f"{filename}.jsonl"),
+            os.path.join(self.vector_db_path, f"{filename}.npy")
+        )
+    
+    def _write_snapshot(self, docs_path: str, log_path: str):
+        """
+        Write all documents to an Arrow IPC file and clear the append-only log.
+        """
+        # Combine the current snapshot with the documents added since
+        table_rows = self._table.num_rows if self._table is not None else 0
+        tables = [self._table] if self._table is not None else []
+        if self._contents:
+            ids = np.arange(table_rows, len(self), dtype=np.int64)
+            tables.append(_documents_to_table(ids, self._contents, self._metadata))
+        table = pa.concat_tables(tables).unify_dictionaries() if tables else _documents_to_table([], [], [])
+        
+        # Write to a temporary file first, since the current file may be memory-mapped
+        tmp_path = f"{docs_path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, docs_path)
+        
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        
+        self._table = table
+        self._contents = []
+        self._metadata = []
+        self._logged = 0
+    
+    def _append_log(self, log_path: str):
+        """
+        Append the documents that are not yet on disk to the JSONL log.
+        """
+        table_rows = self._table.num_rows if self._table is not None else 0
+        with open(log_path, "ab") as f:
+            for i in range(self._logged, len(self._contents)):
+                doc = {"id": table_rows + i, "content": self._contents[i], "metadata": self._metadata[i]}
+                f.write(orjson.dumps(doc) + b"\n")
+        
+        self._logged = len(self._contents)
     
     def save(self, filename: Optional[str] = None):
         """
         Save the vector store to disk.
         
+        New documents are appended to a JSONL log, so repeated saves during an
+        ingest only write what was added. The log is folded into the Arrow
+        snapshot once it grows larger than the snapshot itself.
+        
         Args:
             filename: The filename to save to (without extension)
         """
@@ -105,15 +477,84 @@ class FAISSVectorStore:
             filename = "vector_store"
         
         # Create full paths
-        index_path = os.path.join(self.vector_db_path, f"{filename}.index")
-        docs_path = os.path.join(self.vector_db_path, f"{filename}.pkl")
+        index_path, docs_path, log_path, vectors_path = self._get_paths(filename)
+        
+        # Save documents before the index, which must never refer to unsaved documents
+        table_rows = self._table.num_rows if self._table is not None else 0
+        if filename != self._filename or len(self._contents) > max(SNAPSHOT_MIN_DOCUMENTS, table_rows):
+            self._write_snapshot(docs_path, log_path)
+        else:
+            self._append_log(log_path)
+        self._filename = filename
         
         # Save FAISS index
-        faiss.write_index(self.index, index_path)
+        if isinstance(self.index, faiss.IndexBinary):
+            faiss.write_index_binary(self.index, index_path)
+        else:
+            faiss.write_index(self.index, index_path)
         
-        # Save documents
-        with open(docs_path, "wb") as f:
-            pickle.dump(self.documents, f)
+        # Save full-precision vectors for reranking, through a temporary file,
+        # since the current file may be memory-mapped
+        vectors = self._get_vectors()
+        if vectors is not None:
+            tmp_path = f"{vectors_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, vectors)
+            os.replace(tmp_path, vectors_path)
+    
+    def _add_ids(self, index: faiss.Index) -> faiss.IndexIDMap2:
+        """
+        Rebuild an index saved before documents had explicit ids, with each
+        vector under its position as its document id.
+        """
+        vectors = index.reconstruct_n(0, index.ntotal)
+        index.reset()
+        
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+        return index
+    
+    def _read_documents(self, filename: str):
+        """
+        Read the documents of a saved vector store, memory-mapping its snapshot.
+        """
+        _, docs_path, log_path, _ = self._get_paths(filename)
+        legacy_docs_path = os.path.join(self.vector_db_path, f"{filename}.pkl")
+        
+        if os.path.exists(docs_path) or os.path.exists(log_path):
+            # Memory-map the snapshot; rows are only read when they are accessed
+            self._table = None
+            if os.path.exists(docs_path):
+                self._table = ipc.open_file(pa.memory_map(docs_path, "r")).read_all()
+            
+            # Documents added since the snapshot are replayed from the log
+            documents = []
+            if os.path.exists(log_path):
+                with open(log_path, "rb") as f:
+                    documents = [orjson.loads(line) for line in f]
+            
+            self._filename = filename
+            self._logged = len(documents)
+        else:
+            # Vector stores saved before the Arrow format kept documents in a pickle
+            with open(legacy_docs_path, "rb") as f:
+                self._table = None
+                documents = pickle.load(f)
+            
+            # Write a full snapshot on the next save
+            self._filename = None
+            self._logged = 0
+        
+        self._contents = [doc["content"] for doc in documents]
+        self._metadata = [doc.get("metadata", {}) for doc in documents]
+    
+    def _has_documents(self, filename: str) -> bool:
+        """
+        Check whether a saved vector store has documents on disk, in any format.
+        """
+        _, docs_path, log_path, _ = self._get_paths(filename)
+        legacy_docs_path = os.path.join(self.vector_db_path, f"{filename}.pkl")
+        return any(os.path.exists(path) for path in (docs_path, log_path, legacy_docs_path))
     
     def load(self, filename: Optional[str] = None) -> bool:
         """
@@ -129,22 +570,55 @@ class FAISSVectorStore:
             filename = "vector_store"
         
         # Create full paths
-        index_path = os.path.join(self.vector_db_path, f"{filename}.index")
-        docs_path = os.path.join(self.vector_db_path, f"{filename}.pkl")
+        index_path, _, _, vectors_path = self._get_paths(filename)
         
         # Check if files exist
-        if not os.path.exists(index_path) or not os.path.exists(docs_path):
+        if not os.path.exists(index_path) or not self._has_documents(filename):
             return False
         
         try:
             # Load FAISS index
-            self.index = faiss.read_index(index_path)
+            try:
+                self.index = faiss.read_index(index_path)
+            except RuntimeError:
+                # Binary indexes are stored in their own format
+                self.index = faiss.read_index_binary(index_path)
+            if not isinstance(self.index, (faiss.IndexIDMap, faiss.IndexBinaryIDMap)):
+                self.index = self._add_ids(self.index)
+            self._set_search_params()
             
-            # Load documents
-            with open(docs_path, "rb") as f:
-                self.documents = pickle.load(f)
+            # Memory-map the full-precision vectors for reranking
+            self._vector_batches = []
+            if self.rerank and os.path.exists(vectors_path):
+                self._vector_batches = [np.load(vectors_path, mmap_mode="r")]
             
+            self._read_documents(filename)
             return True
         except Exception as e:
             print(f"Error loading vector store: {e}")
+            return False
+    
+    def load_documents(self, filename: Optional[str] = None) -> bool:
+        """
+        Load only the documents of a saved vector store, without its index or
+        vectors. The documents can then be read, but the store is not searched
+        or added to.
+        
+        Args:
+            filename: The filename to load from (without extension)
+            
+        Returns:
+            True if the documents were loaded successfully, False otherwise
+        """
+        if filename is None:
+            filename = "vector_store"
+        
+        if not self._has_documents(filename):
+            return False
+        
+        try:
+            self._read_documents(filename)
+            return True
+        except Exception as e:
+            print(f"Error loading vector store documents: {e}")
             return False
\ No newline at end of file
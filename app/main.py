@@ -1,16 +1,43 @@
 import os
+import re
+import csv
+import html
+import stat
+import hashlib
 import markdown
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache, wraps
+from io import StringIO
+from markupsafe import escape
+from urllib.parse import parse_qs
 from fastapi import FastAPI, Request, HTTPException
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.responses import Response
 
 # Import API routes
 from app.api.routes import router as api_router
 from app.core.chunking import get_file_type
+from app.core.embeddings import EMBEDDING_MODEL
+from app.core.query import COMPLETION_MODEL
+
+# Settings from environment variables, which do not change while the server runs
+API_TITLE = os.getenv("API_TITLE", "PYMPL2 Python3 API")
+DOCS_DIR = os.getenv("DOCS_DIR", "./DOCUMENTATION")
+DOCS_ROOT = os.path.realpath(DOCS_DIR)
+
+METADATA = {
+    "name": "API Documentation Assistant",
+    "version": "0.1.0",
+    "embedding_model": EMBEDDING_MODEL,
+    "completion_model": COMPLETION_MODEL,
+}
 
 # Create FastAPI app
 app = FastAPI(
@@ -28,21 +55,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """
+    Gzip responses, except server-sent event streams, which the compressor would
+    hold back until enough output has accumulated.
+    """
+    
+    UNCOMPRESSED_PATHS = frozenset({"/api/query/stream"})
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress responses; the viewer pages are large and repetitive HTML
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+STATIC_DIR = "app/static"
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Static files that browsers may cache indefinitely when requested through a
+    versioned URL from static_url, since a new version gets a new URL.
+    """
+    
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code == 200 and "v" in parse_qs(scope.get("query_string", b"").decode("latin-1")):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+@lru_cache(maxsize=None)
+def static_url(path: str) -> str:
+    """Get the URL of a static file, versioned by a hash of its content."""
+    with open(os.path.join(STATIC_DIR, path), "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    return f"/static/{path}?v={digest}"
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
-# Set up templates
+# Set up templates; they do not change while the server runs, so they are
+# compiled once and never checked for updates
 templates = Jinja2Templates(directory="app/templates")
+templates.env.auto_reload = False
+templates.env.globals["static_url"] = static_url
 
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header matches an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def _not_modified_since(request: Request, mtime: float) -> bool:
+    """Check whether a file is unchanged since the client's If-Modified-Since date."""
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        # HTTP dates have a resolution of one second
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+def _with_etag(request: Request, response: Response) -> Response:
+    """Tag a fully rendered response with an ETag of its body, answering 304 if the client has it."""
+    etag = f'W/"{hashlib.blake2b(response.body, digest_size=8).hexdigest()}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return response
+
 # Root endpoint - serve the frontend
 @app.get("/")
 async def root(request: Request):
-    # Get API title from environment variable or use default
-    api_title = os.getenv("API_TITLE", "PYMPL2 Python3 API")
-    return templates.TemplateResponse("index.html", {"request": request, "api_title": api_title})
+    return _with_etag(request, templates.TemplateResponse("index.html", {"request": request, "api_title": API_TITLE}))
 
 # Health check endpoint
 @app.get("/health")
@@ -51,434 +144,302 @@ async def health_check():
 
 # Metadata endpoint
 @app.get("/metadata")
-async def metadata():
-    return {
-        "name": "API Documentation Assistant",
-        "version": "0.1.0",
-        "embedding_model": os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
-        "completion_model": os.getenv("COMPLETION_MODEL", "gpt-4o"),
-    }
+async def metadata(request: Request):
+    return _with_etag(request, JSONResponse(METADATA))
 
 # Generic file viewer endpoint
 @app.get("/docs/{file_path:path}", response_class=HTMLResponse)
 async def view_file(request: Request, file_path: str):
-    # Get the documentation directory from environment variables
-    docs_dir = os.getenv("DOCS_DIR", "./DOCUMENTATION")
-    # Get API title from environment variable or use default
-    api_title = os.getenv("API_TITLE", "PYMPL2 Python3 API")
-    
-    # Construct the full file path
-    full_path = os.path.join(docs_dir, file_path)
-    
-    # Check if the file exists
-    if not os.path.exists(full_path) or not os.path.isfile(full_path):
+    # Resolve and check the file without blocking the event loop on the filesystem
+    resolved = await run_in_threadpool(_resolve_doc, file_path)
+    if resolved is None:
         raise HTTPException(status_code=404, detail="File not found")
+    full_path, st = resolved
     
     # Determine file type
     file_type = get_file_type(file_path)
     
     try:
-        # Read the file
-        with open(full_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Rendered bodies are cached per version of the file, identified by its
+        # modification time and size, so unchanged files are not read again
+        version = (full_path, st.st_mtime_ns, st.st_size)
+        
+        # Let clients revalidate their copy of the page without it being rendered again
+        mtime = max(st.st_mtime, VIEW_SHELLS_MTIME)
+        cache_headers = {
+            "ETag": f'W/"{VIEW_SHELLS_VERSION}-{st.st_mtime_ns:x}-{st.st_size:x}"',
+            "Last-Modified": formatdate(mtime, usegmt=True),
+            "Cache-Control": "public, max-age=60"
+        }
+        if request.headers.get("if-none-match") is not None:
+            not_modified = _etag_matches(request, cache_headers["ETag"])
+        else:
+            not_modified = _not_modified_since(request, mtime)
+        if not_modified:
+            return Response(status_code=304, headers=cache_headers)
         
         # Handle different file types
         if file_type == "markdown":
-            return await render_markdown(content, file_path, api_title)
-        elif file_type in ["python", "javascript", "typescript", "java", "cpp", "c", "go", "rust", "php", "ruby", "swift", "kotlin", "scala", "r", "matlab", "perl", "bash", "powershell", "batch", "html", "css", "scss", "sass", "less", "xml", "json", "yaml", "toml", "ini", "sql", "graphql"]:
-            return await render_code(content, file_path, api_title, file_type)
+            response = await render_markdown(version, file_path, API_TITLE)
+        elif file_type in CODE_TYPES:
+            response = await render_code(version, file_path, API_TITLE, file_type)
         elif file_type in ["csv", "tsv"]:
-            return await render_csv(content, file_path, api_title, file_type)
+            response = await render_csv(version, file_path, API_TITLE, file_type)
         else:
-            return await render_text(content, file_path, api_title, file_type)
+            response = await render_text(version, file_path, API_TITLE, file_type)
+        
+        response.headers.update(cache_headers)
+        return response
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
 
-async def render_markdown(content: str, file_path: str, api_title: str) -> HTMLResponse:
-    """Render markdown content as HTML."""
-    # Convert Markdown to HTML
-    html_content = markdown.markdown(content, extensions=['fenced_code', 'tables'])
+def _resolve_doc(file_path: str) -> Optional[Tuple[str, os.stat_result]]:
+    """Get the real path and stat of a regular file inside the documentation directory, or None."""
+    # Resolve ".." and symlinks first, so no path can reach outside the directory
+    full_path = os.path.realpath(os.path.join(DOCS_ROOT, file_path))
+    if not full_path.startswith(DOCS_ROOT + os.sep):
+        return None
     
-    # Create HTML page
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{file_path}</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <link rel="stylesheet" href="/static/css/styles.css">
-        <style>
-            .markdown-body {{
-                padding: 2rem;
-                max-width: 1200px;
-                margin: 0 auto;
-                background-color: white;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }}
-            .markdown-body h1, .markdown-body h2, .markdown-body h3,
-            .markdown-body h4, .markdown-body h5, .markdown-body h6 {{
-                color: #4a6fa5;
-                margin-top: 1.5rem;
-                margin-bottom: 1rem;
-            }}
-            .markdown-body code {{
-                background-color: #f0f4f8;
-                padding: 0.2rem 0.4rem;
-                border-radius: 4px;
-            }}
-            .markdown-body pre {{
-                background-color: #f0f4f8;
-                padding: 1rem;
-                border-radius: 4px;
-                overflow-x: auto;
-            }}
-            .markdown-body table {{
-                border-collapse: collapse;
-                width: 100%;
-                margin: 1rem 0;
-            }}
-            .markdown-body th, .markdown-body td {{
-                border: 1px solid #dee2e6;
-                padding: 0.5rem;
-            }}
-            .markdown-body th {{
-                background-color: #f8f9fa;
-            }}
-            .back-button {{
-                margin: 1rem 0;
-                display: inline-block;
-                padding: 0.5rem 1rem;
-                background-color: #4a6fa5;
-                color: white;
-                text-decoration: none;
-                border-radius: 4px;
-            }}
-            .back-button:hover {{
-                background-color: #3a5a8a;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <h1>API Documentation Assistant</h1>
-                <p>Viewing {api_title} documentation: {file_path}</p>
-            </header>
-            
-            <a href="/" class="back-button">Back to Search</a>
-            
-            <div class="markdown-body">
-                {html_content}
-            </div>
-            
-            <footer>
-                <p>Powered by OpenAI and FAISS</p>
-            </footer>
-        </div>
-    </body>
-    </html>
-    """
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        return None
     
-    return HTMLResponse(content=html)
+    return (full_path, st) if stat.S_ISREG(st.st_mode) else None
 
-async def render_code(content: str, file_path: str, api_title: str, file_type: str) -> HTMLResponse:
-    """Render code content with syntax highlighting."""
-    # Map file types to language identifiers for syntax highlighting
-    language_map = {
-        "python": "python",
-        "javascript": "javascript",
-        "typescript": "typescript",
-        "java": "java",
-        "cpp": "cpp",
-        "c": "c",
-        "go": "go",
-        "rust": "rust",
-        "php": "php",
-        "ruby": "ruby",
-        "swift": "swift",
-        "kotlin": "kotlin",
-        "scala": "scala",
-        "r": "r",
-        "matlab": "matlab",
-        "perl": "perl",
-        "bash": "bash",
-        "powershell": "powershell",
-        "batch": "batch",
-        "html": "html",
-        "css": "css",
-        "scss": "scss",
-        "sass": "sass",
-        "less": "less",
-        "xml": "xml",
-        "json": "json",
-        "yaml": "yaml",
-        "toml": "toml",
-        "ini": "ini",
-        "sql": "sql",
-        "graphql": "graphql"
-    }
+def _read_file(full_path: str, newline: Optional[str] = None) -> str:
+    """Read a documentation file as text."""
+    with open(full_path, "r", encoding="utf-8", newline=newline) as f:
+        return f.read()
+
+# Markdown converters are costly to set up but not safe to share between
+# threads, so each threadpool worker keeps its own and resets it between files
+_markdown_local = threading.local()
+
+def _get_markdown() -> markdown.Markdown:
+    """Get this thread's markdown converter, creating it on first use."""
+    md = getattr(_markdown_local, "md", None)
+    if md is None:
+        md = _markdown_local.md = markdown.Markdown(extensions=['fenced_code', 'tables'])
+    return md
+
+# Rendered bodies are only cached for files up to this size, so that the 256
+# cached bodies of each kind stay small however large the viewed files are
+VIEW_CACHE_MAX_FILE_BYTES = 128 << 10
+
+def _cache_small_bodies(render):
+    """Cache a body renderer per version of the file, except for files over VIEW_CACHE_MAX_FILE_BYTES."""
+    cached = lru_cache(maxsize=256)(render)
     
-    language = language_map.get(file_type, "text")
+    @wraps(render)
+    def render_body(full_path: str, mtime_ns: int, size: int) -> str:
+        if size > VIEW_CACHE_MAX_FILE_BYTES:
+            return render(full_path, mtime_ns, size)
+        return cached(full_path, mtime_ns, size)
     
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{file_path}</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <link rel="stylesheet" href="/static/css/styles.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/themes/prism.min.css">
-        <style>
-            .code-container {{
-                padding: 2rem;
-                max-width: 1200px;
-                margin: 0 auto;
-                background-color: white;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }}
-            .file-info {{
-                background-color: #f8f9fa;
-                padding: 1rem;
-                border-radius: 4px;
-                margin-bottom: 1rem;
-                border-left: 4px solid #4a6fa5;
-            }}
-            .back-button {{
-                margin: 1rem 0;
-                display: inline-block;
-                padding: 0.5rem 1rem;
-                background-color: #4a6fa5;
-                color: white;
-                text-decoration: none;
-                border-radius: 4px;
-            }}
-            .back-button:hover {{
-                background-color: #3a5a8a;
-            }}
-            pre {{
-                margin: 0;
-                border-radius: 4px;
-            }}
-            code {{
-                font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-                font-size: 14px;
-                line-height: 1.5;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <h1>API Documentation Assistant</h1>
-                <p>Viewing {api_title} documentation: {file_path}</p>
-            </header>
-            
-            <a href="/" class="back-button">Back to Search</a>
-            
-            <div class="code-container">
-                <div class="file-info">
-                    <strong>File:</strong> {file_path}<br>
-                    <strong>Type:</strong> {file_type}<br>
-                    <strong>Language:</strong> {language}
-                </div>
-                
-                <pre><code class="language-{language}">{content}</code></pre>
-            </div>
-            
-            <footer>
-                <p>Powered by OpenAI and FAISS</p>
-            </footer>
-        </div>
-        
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-core.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/autoloader/prism-autoloader.min.js"></script>
-    </body>
-    </html>
-    """
+    render_body.cache_info = cached.cache_info
+    render_body.cache_clear = cached.cache_clear
+    return render_body
+
+# The rendering helpers below read files and are called through run_in_threadpool
+@_cache_small_bodies
+def _render_markdown_body(full_path: str, mtime_ns: int, size: int) -> str:
+    """Convert a markdown file to HTML, once per version of the file."""
+    return _get_markdown().reset().convert(_read_file(full_path))
+
+@_cache_small_bodies
+def _render_escaped_body(full_path: str, mtime_ns: int, size: int) -> str:
+    """Read a file and escape its HTML characters, once per version of the file."""
+    return html.escape(_read_file(full_path), quote=False)
+
+# Inline styles of the CSV table cells
+CSV_HEADER_STYLE = "padding: 8px; background-color: #f8f9fa; border: 1px solid #dee2e6;"
+CSV_CELL_STYLE = "padding: 8px; border: 1px solid #dee2e6;"
+
+class _CSVTable:
+    """The HTML table of a CSV/TSV file's text, produced row by row as it is iterated."""
+    
+    def __init__(self, content: str, file_type: str):
+        self.content = content
+        self.delimiter = ',' if file_type == 'csv' else '\t'
+        # The number of rows produced so far, shown after the table
+        self.row_count = 0
     
-    return HTMLResponse(content=html)
+    def __iter__(self) -> Iterator[str]:
+        yield "<table border='1' style='border-collapse: collapse; width: 100%;'>"
+        
+        try:
+            for row in csv.reader(StringIO(self.content), delimiter=self.delimiter):
+                if self.row_count == 0:  # Header row
+                    cells = "".join(f"<th style='{CSV_HEADER_STYLE}'>{html.escape(cell)}</th>" for cell in row)
+                else:
+                    cells = "".join(f"<td style='{CSV_CELL_STYLE}'>{html.escape(cell)}</td>" for cell in row)
+                self.row_count += 1
+                yield f"<tr>{cells}</tr>"
+        except csv.Error as e:
+            # The response has already started, so the error is shown in the table
+            yield f"<tr><td style='{CSV_CELL_STYLE}'>Error reading file: {html.escape(str(e))}</td></tr>"
+        
+        yield "</table>"
 
-async def render_csv(content: str, file_path: str, api_title: str, file_type: str) -> HTMLResponse:
-    """Render CSV/TSV content as a table."""
-    import csv
-    from io import StringIO
+# Size of the slices large file bodies are streamed in
+VIEW_STREAM_CHUNK_SIZE = 64 * 1024
+
+def _slices(body: str) -> Iterator[str]:
+    """Split a rendered body into slices of VIEW_STREAM_CHUNK_SIZE characters."""
+    for i in range(0, len(body), VIEW_STREAM_CHUNK_SIZE):
+        yield body[i:i + VIEW_STREAM_CHUNK_SIZE]
+
+class _ShellBody(str):
+    """Stands in for a page body, and its attributes, while a template is compiled into a shell."""
+    row_count = "\0body.row_count\0"
+
+def _compile_shell(name: str) -> Tuple[str, str]:
+    """Render a viewer template once into format strings for the page before and after its body."""
+    # Render with placeholders in place of the per-request values, then turn
+    # them into str.format fields, escaping the braces already in the page
+    fields = {field: f"\0{field}\0" for field in ("file_path", "api_title", "file_type", "language")}
+    page = templates.get_template(name).render(body=_ShellBody("\0body\0"), **fields)
+    page = page.replace("{", "{{").replace("}", "}}")
+    page = re.sub(r"\0([\w.]+)\0", r"{\1}", page)
+    head, tail = page.split("{body}")
+    return head, tail
+
+# The viewer pages, rendered from their templates once at import and filled in
+# with str.format, which is far cheaper than rendering a template per request
+VIEW_SHELLS = {
+    "markdown": _compile_shell("view_markdown.html"),
+    "code": _compile_shell("view_code.html"),
+    "csv": _compile_shell("view_csv.html"),
+    "text": _compile_shell("view_text.html")
+}
+
+# What a viewer page depends on besides its file: the shells, with their
+# versioned stylesheet URLs, and the API title filled into them. A change to
+# any of these gives every page a new ETag, and a template or static file
+# changed since a file was gives its page a newer Last-Modified
+VIEW_SHELLS_VERSION = hashlib.blake2b(repr((VIEW_SHELLS, API_TITLE)).encode(), digest_size=4).hexdigest()
+VIEW_SHELLS_MTIME = max(
+    os.stat(os.path.join(root, name)).st_mtime
+    for directory in ("app/templates", STATIC_DIR)
+    for root, _, names in os.walk(directory)
+    for name in names
+)
+
+def _shell_fields(**values) -> Dict[str, Any]:
+    """Escape the per-request values of a viewer page, as the template would."""
+    return {key: escape(value) for key, value in values.items()}
+
+def _stream_page(shell: Tuple[str, str], fields: Dict[str, Any], body: Iterable[str]) -> Iterator[str]:
+    """Yield a viewer page in pieces of about VIEW_STREAM_CHUNK_SIZE, filling in its shell around the body."""
+    # StreamingResponse iterates this in a threadpool, so the body may read its file lazily
+    head, tail = shell
+    buffer = [head.format_map(fields)]
+    size = len(buffer[0])
+    for part in body:
+        buffer.append(part)
+        size += len(part)
+        if size >= VIEW_STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
     
-    # Parse CSV content
-    delimiter = ',' if file_type == 'csv' else '\t'
-    reader = csv.reader(StringIO(content), delimiter=delimiter)
-    rows = list(reader)
+    # The tail is only filled in now, since it may show what the body counted
+    buffer.append(tail.format_map({**fields, "body": body}))
+    yield "".join(buffer)
+
+async def render_markdown(version: Tuple[str, int, int], file_path: str, api_title: str) -> HTMLResponse:
+    """Render markdown content as HTML."""
+    # Convert Markdown to HTML
+    html_content = await run_in_threadpool(_render_markdown_body, *version)
     
-    if not rows:
-        return await render_text(content, file_path, api_title, file_type)
+    head, tail = VIEW_SHELLS["markdown"]
+    fields = _shell_fields(file_path=file_path, api_title=api_title)
+    return HTMLResponse(content=head.format_map(fields) + html_content + tail.format_map(fields))
+
+# Map file types to language identifiers for syntax highlighting
+LANGUAGE_MAP = {
+    "python": "python",
+    "javascript": "javascript",
+    "typescript": "typescript",
+    "java": "java",
+    "cpp": "cpp",
+    "c": "c",
+    "go": "go",
+    "rust": "rust",
+    "php": "php",
+    "ruby": "ruby",
+    "swift": "swift",
+    "kotlin": "kotlin",
+    "scala": "scala",
+    "r": "r",
+    "matlab": "matlab",
+    "perl": "perl",
+    "bash": "bash",
+    "powershell": "powershell",
+    "batch": "batch",
+    "html": "html",
+    "css": "css",
+    "scss": "scss",
+    "sass": "sass",
+    "less": "less",
+    "xml": "xml",
+    "json": "json",
+    "yaml": "yaml",
+    "toml": "toml",
+    "ini": "ini",
+    "sql": "sql",
+    "graphql": "graphql"
+}
+
+# File types rendered as code with syntax highlighting
+CODE_TYPES = frozenset(LANGUAGE_MAP)
+
+async def render_code(version: Tuple[str, int, int], file_path: str, api_title: str, file_type: str) -> Response:
+    """Render code content with syntax highlighting."""
+    language = LANGUAGE_MAP.get(file_type, "text")
     
-    # Create table HTML
-    table_html = "<table border='1' style='border-collapse: collapse; width: 100%;'>"
+    # Escape HTML characters so markup in the code is shown rather than interpreted
+    content = await run_in_threadpool(_render_escaped_body, *version)
     
-    for i, row in enumerate(rows):
-        table_html += "<tr>"
-        for cell in row:
-            if i == 0:  # Header row
-                table_html += f"<th style='padding: 8px; background-color: #f8f9fa; border: 1px solid #dee2e6;'>{cell}</th>"
-            else:
-                table_html += f"<td style='padding: 8px; border: 1px solid #dee2e6;'>{cell}</td>"
-        table_html += "</tr>"
+    fields = _shell_fields(file_path=file_path, api_title=api_title, file_type=file_type, language=language)
+    page = _stream_page(VIEW_SHELLS["code"], fields, _slices(content))
+    return StreamingResponse(page, media_type="text/html")
+
+async def render_csv(version: Tuple[str, int, int], file_path: str, api_title: str, file_type: str) -> Response:
+    """Render CSV/TSV content as a table."""
+    full_path, _, size = version
     
-    table_html += "</table>"
+    # Only an empty file has no rows
+    if size == 0:
+        return await render_text(version, file_path, api_title, file_type)
     
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{file_path}</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <link rel="stylesheet" href="/static/css/styles.css">
-        <style>
-            .data-container {{
-                padding: 2rem;
-                max-width: 1200px;
-                margin: 0 auto;
-                background-color: white;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                overflow-x: auto;
-            }}
-            .file-info {{
-                background-color: #f8f9fa;
-                padding: 1rem;
-                border-radius: 4px;
-                margin-bottom: 1rem;
-                border-left: 4px solid #4a6fa5;
-            }}
-            .back-button {{
-                margin: 1rem 0;
-                display: inline-block;
-                padding: 0.5rem 1rem;
-                background-color: #4a6fa5;
-                color: white;
-                text-decoration: none;
-                border-radius: 4px;
-            }}
-            .back-button:hover {{
-                background-color: #3a5a8a;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <h1>API Documentation Assistant</h1>
-                <p>Viewing {api_title} documentation: {file_path}</p>
-            </header>
-            
-            <a href="/" class="back-button">Back to Search</a>
-            
-            <div class="data-container">
-                <div class="file-info">
-                    <strong>File:</strong> {file_path}<br>
-                    <strong>Type:</strong> {file_type}<br>
-                    <strong>Rows:</strong> {len(rows)}
-                </div>
-                
-                {table_html}
-            </div>
-            
-            <footer>
-                <p>Powered by OpenAI and FAISS</p>
-            </footer>
-        </div>
-    </body>
-    </html>
-    """
+    # Read and decode the file before the response starts, so that an undecodable
+    # file is still reported as an error rather than as a truncated table
+    content = await run_in_threadpool(_read_file, full_path, "")
     
-    return HTMLResponse(content=html)
+    # The table is streamed as the text is parsed, so its row count follows it
+    fields = _shell_fields(file_path=file_path, api_title=api_title, file_type=file_type)
+    page = _stream_page(VIEW_SHELLS["csv"], fields, _CSVTable(content, file_type))
+    return StreamingResponse(page, media_type="text/html")
 
-async def render_text(content: str, file_path: str, api_title: str, file_type: str) -> HTMLResponse:
+async def render_text(version: Tuple[str, int, int], file_path: str, api_title: str, file_type: str) -> Response:
     """Render plain text content."""
     # Escape HTML characters
-    escaped_content = content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{file_path}</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <link rel="stylesheet" href="/static/css/styles.css">
-        <style>
-            .text-container {{
-                padding: 2rem;
-                max-width: 1200px;
-                margin: 0 auto;
-                background-color: white;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }}
-            .file-info {{
-                background-color: #f8f9fa;
-                padding: 1rem;
-                border-radius: 4px;
-                margin-bottom: 1rem;
-                border-left: 4px solid #4a6fa5;
-            }}
-            .text-content {{
-                font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-                font-size: 14px;
-                line-height: 1.5;
-                white-space: pre-wrap;
-                background-color: #f8f9fa;
-                padding: 1rem;
-                border-radius: 4px;
-                overflow-x: auto;
-            }}
-            .back-button {{
-                margin: 1rem 0;
-                display: inline-block;
-                padding: 0.5rem 1rem;
-                background-color: #4a6fa5;
-                color: white;
-                text-decoration: none;
-                border-radius: 4px;
-            }}
-            .back-button:hover {{
-                background-color: #3a5a8a;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <h1>API Documentation Assistant</h1>
-                <p>Viewing {api_title} documentation: {file_path}</p>
-            </header>
-            
-            <a href="/" class="back-button">Back to Search</a>
-            
-            <div class="text-container">
-                <div class="file-info">
-                    <strong>File:</strong> {file_path}<br>
-                    <strong>Type:</strong> {file_type}
-                </div>
-                
-                <div class="text-content">{escaped_content}</div>
-            </div>
-            
-            <footer>
-                <p>Powered by OpenAI and FAISS</p>
-            </footer>
-        </div>
-    </body>
-    </html>
-    """
+    escaped_content = await run_in_threadpool(_render_escaped_body, *version)
     
-    return HTMLResponse(content=html)
+    fields = _shell_fields(file_path=file_path, api_title=api_title, file_type=file_type)
+    page = _stream_page(VIEW_SHELLS["text"], fields, _slices(escaped_content))
+    return StreamingResponse(page, media_type="text/html")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
\ No newline at end of file
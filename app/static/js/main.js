@@ -113,7 +113,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 <div class="source">
                     <div class="source-header">
                         <span>${sourceLink}</span>
-                        <span>Relevance: ${Math.round((1 - source.score) * 100)}%</span>
+                        <span>Relevance: ${Math.round(source.score * 100)}%</span>
                     </div>
                     ${contextInfo}
                     <div class="source-content">${source.content}</div>
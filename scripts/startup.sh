@@ -20,4 +20,6 @@ mkdir -p $VECTOR_DB_PATH
 
 # Start the FastAPI application
 echo "Starting FastAPI application..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+    --loop uvloop --http httptools \
+    --workers "${WEB_CONCURRENCY:-$(nproc)}"
\ No newline at end of file
@@ -1,12 +1,19 @@
 import os
+import httpx
 from openai import OpenAI
 
 # Clear all proxy environment variables
-for var in ["HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY"]:
+for var in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY"):
     os.environ.pop(var, None)
 
 print("Creating OpenAI client...")
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# One keep-alive HTTP/2 connection carries every request the script makes
+http_client = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=4)
+)
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
 
 print("Client created successfully.")
 
@@ -20,4 +27,6 @@ try:
     print("Embedding request successful!")
     print(f"Received {len(response.data[0].embedding)} dimensions")
 except Exception as e:
-    print(f"Error during embedding request: {e}")
\ No newline at end of file
+    print(f"Error during embedding request: {e}")
+finally:
+    client.close()
\ No newline at end of file
@@ -1,120 +1,338 @@
 import os
 import sys
-import glob
-from typing import List, Dict, Any
+import json
+import math
+import asyncio
+import numpy as np
+from collections import deque
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    # Progress is printed once per batch when tqdm is not installed
+    tqdm = None
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.chunking import chunk_text, get_file_type
-from app.core.embeddings import get_embeddings
-from app.db.vector_store import FAISSVectorStore
+from app.core.chunking import FILE_TYPES, iter_file_chunks
+from app.core.embeddings import aget_embeddings, open_embedding_cache, close_embedding_cache
+from app.db.vector_store import VECTOR_DTYPES, FAISSVectorStore
 
-def vectorize_documentation():
+# The number of embedding requests kept in flight at once; raise it if the
+# provider's rate limits allow, lower it if requests are being throttled
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))
+
+# Chunks are embedded in batches of about this many tokens, estimated at four
+# characters per token, and at most this many chunks
+EMBED_TOKEN_BUDGET = int(os.getenv("EMBED_TOKEN_BUDGET", "16384"))
+MAX_BATCH_CHUNKS = 256
+
+# Files larger than this are skipped rather than read into memory
+MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", str(5 << 20)))
+
+# The type of FAISS index to build (see FAISSVectorStore), and how many chunks
+# are held back to size and train it before the first one is added
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "HNSW").upper()
+EMBED_DTYPE = os.getenv("EMBED_DTYPE", "float32").lower()
+USE_GPU_FAISS = os.getenv("USE_GPU_FAISS", "0") == "1"
+TRAINING_SAMPLE_SIZE = 20000
+
+# Full-precision vectors are saved alongside the index when the server will
+# rerank with them (see RERANK_FACTOR in app.core.query)
+RERANK = int(os.getenv("RERANK_FACTOR", "0")) > 0
+
+# The modification time and size of every file in the last complete run,
+# kept next to the vector store so unchanged files need not be read again
+MANIFEST_FILENAME = ".index_manifest.json"
+
+# Hidden files to vectorize, matched by their whole name
+SUPPORTED_HIDDEN_FILES = frozenset({".gitignore", ".dockerfile", ".dockerignore", ".gitattributes"})
+
+# Extensions of the files to vectorize: every one chunking knows the type of
+SUPPORTED_EXTENSIONS = frozenset(FILE_TYPES) - SUPPORTED_HIDDEN_FILES
+
+def find_files(root: str) -> Iterator[os.DirEntry]:
     """
-    Vectorize all files in the documentation directory.
+    Find the supported files under a directory.
+    
+    Walks the tree once with os.scandir, whose entries know their type from
+    the directory listing itself, and looks each name's extension up in
+    SUPPORTED_EXTENSIONS. Hidden directories are skipped, and hidden files
+    are only included if they are listed in SUPPORTED_HIDDEN_FILES. Each
+    directory's entries are visited in name order, so the files come out in
+    a deterministic order without sorting the whole list.
+    
+    Args:
+        root: The directory to search
+        
+    Returns:
+        An iterator over the directory entries of the supported files
     """
-    # Get the documentation directory from environment variables
-    docs_dir = os.getenv("DOCS_DIR", "./DOCUMENTATION")
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
     
-    print(f"Vectorizing documentation in {docs_dir}...")
+    for entry in entries:
+        name = entry.name
+        if entry.is_dir():
+            if not name.startswith("."):
+                yield from find_files(entry.path)
+        elif name.startswith("."):
+            if name in SUPPORTED_HIDDEN_FILES and entry.is_file():
+                yield entry
+        elif os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS and entry.is_file():
+            yield entry
+
+async def embed_batch(batch: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Embed a batch of chunks, requesting each distinct content only once.
     
-    # Initialize vector store
-    vector_store = FAISSVectorStore()
-    
-    # Define supported file extensions
-    supported_extensions = [
-        # Markdown
-        "*.md", "*.markdown",
-        # Programming languages
-        "*.py", "*.js", "*.ts", "*.jsx", "*.tsx", "*.java", "*.cpp", "*.cc", "*.cxx", 
-        "*.c", "*.h", "*.hpp", "*.go", "*.rs", "*.php", "*.rb", "*.swift", "*.kt", 
-        "*.scala", "*.r", "*.m", "*.pl", "*.sh", "*.bash", "*.zsh", "*.fish", 
-        "*.ps1", "*.bat", "*.cmd",
-        # Web technologies
-        "*.html", "*.htm", "*.css", "*.scss", "*.sass", "*.less", "*.xml", 
-        "*.json", "*.yaml", "*.yml", "*.toml", "*.ini", "*.cfg", "*.conf",
-        # Documentation
-        "*.txt", "*.rst", "*.adoc", "*.tex",
-        # Configuration files
-        "*.env", ".gitignore", ".dockerfile", ".dockerignore", ".gitattributes",
-        # Data files
-        "*.csv", "*.tsv", "*.sql", "*.graphql", "*.gql"
-    ]
-    
-    # Find all supported files in the documentation directory
-    all_files = []
-    for pattern in supported_extensions:
-        files = glob.glob(os.path.join(docs_dir, "**", pattern), recursive=True)
-        all_files.extend(files)
-    
-    # Remove duplicates and sort
-    all_files = sorted(list(set(all_files)))
+    Args:
+        batch: The chunks to embed
+        
+    Returns:
+        A float32 matrix with one embedding vector per chunk
+    """
+    # Number the distinct contents in order of first appearance
+    text_ids: Dict[str, int] = {}
+    positions = [text_ids.setdefault(chunk["content"], len(text_ids)) for chunk in batch]
+    return (await aget_embeddings(list(text_ids)))[positions]
+
+def read_manifest(path: str) -> Dict[str, List[int]]:
+    """
+    Read the manifest of the last complete run.
     
-    print(f"Found {len(all_files)} files to process.")
+    Returns:
+        The [mtime_ns, size] of each file by its path relative to the documentation
+        directory, or an empty dictionary if there is no usable manifest
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def iter_all_chunks(
+    files: List[str],
+    docs_dir: str,
+    manifest: Dict[str, List[int]],
+    previous_manifest: Dict[str, List[int]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Chunk all files in order, copying the chunks of files that are unchanged
+    since the last run from the previous vector store instead of reading them.
+    
+    Args:
+        files: The paths of the files to chunk
+        docs_dir: The documentation directory
+        manifest: The [mtime_ns, size] of each file now
+        previous_manifest: The manifest of the last complete run
+        
+    Returns:
+        An iterator over the chunks of all files, in order
+    """
+    # A file is unchanged if its modification time and size are
+    previous_ids: Dict[str, List[int]] = {
+        rel_path: [] for rel_path, signature in manifest.items()
+        if previous_manifest.get(rel_path) == signature
+    }
+    
+    # Only the documents are needed to copy chunks, not the index or vectors
+    previous_store = FAISSVectorStore()
+    if previous_ids and previous_store.load_documents():
+        for idx, metadata in enumerate(previous_store.iter_metadata()):
+            ids = previous_ids.get(metadata.get("source"))
+            if ids is not None:
+                ids.append(idx)
+    else:
+        previous_ids = {}
     
-    # Process each file
-    all_chunks = []
+    print(f"Reusing the chunks of {len(previous_ids)} unchanged files.")
     
-    for file_path in all_files:
-        # Get relative path for metadata
-        rel_path = os.path.relpath(file_path, docs_dir)
+    changed = [path for path in files if os.path.relpath(path, docs_dir) not in previous_ids]
+    new_chunks = iter_file_chunks(changed, docs_dir=docs_dir)
+    for path in files:
+        ids = previous_ids.get(os.path.relpath(path, docs_dir))
+        if ids is None:
+            yield from next(new_chunks)
+        elif ids:
+            yield from previous_store.get_documents(ids)
+
+def create_vector_store(sample_size: int) -> FAISSVectorStore:
+    """
+    Create a vector store with the index type selected by FAISS_INDEX_TYPE.
+    
+    Args:
+        sample_size: The number of vectors the index will be trained on
         
-        # Determine file type
-        file_type = get_file_type(file_path)
+    Returns:
+        An empty vector store
+    """
+    # EMBED_DTYPE only applies to some index types, but a typo is reported for any
+    if EMBED_DTYPE != "float32" and EMBED_DTYPE not in VECTOR_DTYPES:
+        raise ValueError(f"Unsupported EMBED_DTYPE: {EMBED_DTYPE}")
+    
+    if FAISS_INDEX_TYPE == "IVFPQ":
+        # Product quantization needs a training vector per code (2^8) at the very least
+        if sample_size < 256:
+            print(f"Only {sample_size} chunks; using an exact IP index instead of IVFPQ.")
+            return FAISSVectorStore(index_type="IP", dtype=EMBED_DTYPE, rerank=RERANK)
         
-        print(f"Processing {rel_path} (type: {file_type})...")
+        # About sqrt(N) clusters balances the cost of picking clusters against scanning them
+        return FAISSVectorStore(index_type="IVFPQ", nlist=int(math.sqrt(sample_size)), use_gpu=USE_GPU_FAISS, rerank=RERANK)
+    
+    # The other index types quantize vectors in their own way
+    if FAISS_INDEX_TYPE in ("HNSW", "IP", "L2"):
+        return FAISSVectorStore(index_type=FAISS_INDEX_TYPE, dtype=EMBED_DTYPE, rerank=RERANK)
+    
+    return FAISSVectorStore(index_type=FAISS_INDEX_TYPE, use_gpu=USE_GPU_FAISS, rerank=RERANK)
+
+async def add_in_batches(
+    chunks: Iterator[Dict[str, Any]],
+    token_budget: int,
+    max_batch_size: int
+) -> Optional[FAISSVectorStore]:
+    """
+    Embed chunks in batches and add them to a new vector store as their embeddings arrive.
+    
+    Chunks are consumed as they are produced, so only the batches in flight
+    are held in memory, besides the first TRAINING_SAMPLE_SIZE chunks when
+    the index needs training, which are used to create and train it. Several batches are requested
+    concurrently, but they are added in order. The store is only saved once
+    complete, so the one the server reads is never replaced by a partial one;
+    a run that fails finds its embeddings in the on-disk cache when rerun.
+    Repeated content, such as license headers, is embedded once per batch,
+    and later batches find it in the embedding cache.
+    
+    Args:
+        chunks: The chunks to embed, in order
+        token_budget: The approximate number of tokens per batch, so that
+            batches of short chunks are larger than those of long ones
+        max_batch_size: The maximum number of chunks per batch
         
-        try:
-            # Read the file
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            # Create metadata
-            metadata = {
-                "source": rel_path,
-                "file_path": file_path,
-                "file_type": file_type
-            }
-            
-            # Chunk the content using the appropriate method
-            chunks = chunk_text(content, metadata=metadata, file_type=file_type)
-            
-            # Add chunks to the list
-            all_chunks.extend(chunks)
-            
-            print(f"  Created {len(chunks)} chunks.")
-        except Exception as e:
-            print(f"  Error processing {rel_path}: {e}")
-    
-    if not all_chunks:
-        print("No chunks created. Exiting.")
-        return
+    Returns:
+        The vector store, or None if there were no chunks
+    """
+    def next_batch() -> List[Dict[str, Any]]:
+        batch = []
+        tokens = 0
+        for chunk in chunks:
+            batch.append(chunk)
+            tokens += len(chunk["content"]) // 4 + 1
+            if tokens >= token_budget or len(batch) >= max_batch_size:
+                break
+        return batch
+    
+    # Creating the store up front checks the settings before anything is
+    # embedded; one whose index needs training is created again once its
+    # training sample is in, since how it is built depends on the sample size
+    vector_store = create_vector_store(TRAINING_SAMPLE_SIZE)
+    if not vector_store.index.is_trained:
+        vector_store = None
     
-    print(f"Created a total of {len(all_chunks)} chunks.")
+    in_flight = deque()
+    held: List[Tuple[List[Dict[str, Any]], np.ndarray]] = []
+    batch_number = 0
     
-    # Extract content for embedding
-    texts = [chunk["content"] for chunk in all_chunks]
+    async def add_held():
+        nonlocal vector_store
+        if not held:
+            return
+        
+        batch = [chunk for held_batch, _ in held for chunk in held_batch]
+        vectors = held[0][1] if len(held) == 1 else np.concatenate([held_vectors for _, held_vectors in held])
+        held.clear()
+        
+        # The first vectors added to the store are the ones its index is trained on
+        if vector_store is None:
+            vector_store = create_vector_store(len(batch))
+        
+        # Indexing runs in a thread so that the requests still in flight keep progressing
+        await asyncio.to_thread(vector_store.add_documents, batch, vectors)
     
-    # Generate embeddings in batches
-    batch_size = 100
-    all_embeddings = []
+    progress = tqdm(desc="Embedding", unit="chunk") if tqdm is not None else None
     
-    for i in range(0, len(texts), batch_size):
-        batch_texts = texts[i:i+batch_size]
-        print(f"Generating embeddings for batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}...")
+    async def add_oldest():
+        batch, task = in_flight.popleft()
+        held.append((batch, await task))
+        if progress is not None:
+            progress.update(len(batch))
+        if vector_store is not None or sum(len(held_batch) for held_batch, _ in held) >= TRAINING_SAMPLE_SIZE:
+            await add_held()
+    
+    # Chunking runs in worker processes, so waiting for the next batch in a
+    # thread overlaps reading the files with embedding the previous batches
+    while batch := await asyncio.to_thread(next_batch):
+        batch_number += 1
+        if progress is None:
+            print(f"Generating embeddings for batch {batch_number}...")
+        in_flight.append((batch, asyncio.create_task(embed_batch(batch))))
         
-        batch_embeddings = get_embeddings(batch_texts)
-        all_embeddings.extend(batch_embeddings)
+        if len(in_flight) >= EMBEDDING_CONCURRENCY:
+            await add_oldest()
+    
+    while in_flight:
+        await add_oldest()
+    await add_held()
+    
+    if progress is not None:
+        progress.close()
+    
+    return vector_store if vector_store is not None and len(vector_store) else None
+
+def vectorize_documentation():
+    """
+    Vectorize all files in the documentation directory.
+    """
+    # Get the documentation directory from environment variables
+    docs_dir = os.getenv("DOCS_DIR", "./DOCUMENTATION")
+    
+    print(f"Vectorizing documentation in {docs_dir}...")
+    
+    # Find all supported files in the documentation directory, and record what
+    # they look like now; empty files and files over MAX_FILE_BYTES are skipped
+    stats = {}
+    for entry in find_files(docs_dir):
+        st = entry.stat()
+        if st.st_size > MAX_FILE_BYTES:
+            print(f"Skipping {os.path.relpath(entry.path, docs_dir)}: {st.st_size} bytes is over MAX_FILE_BYTES.")
+        elif st.st_size:
+            stats[entry.path] = st
+    
+    all_files = list(stats)
+    manifest = {os.path.relpath(path, docs_dir): [stats[path].st_mtime_ns, stats[path].st_size] for path in all_files}
     
-    print(f"Generated {len(all_embeddings)} embeddings.")
+    print(f"Found {len(all_files)} files to process.")
+    
+    manifest_path = os.path.join(os.getenv("VECTOR_DB_PATH", "./vector_db"), MANIFEST_FILENAME)
+    previous_manifest = read_manifest(manifest_path)
+    
+    # Reuse embeddings of chunks that have not changed since the last run
+    open_embedding_cache()
     
-    # Add documents and embeddings to vector store
-    vector_store.add_documents(all_chunks, all_embeddings)
+    # Read and chunk the changed files in parallel, one worker process per CPU,
+    # while generating embeddings in batches and adding them to the vector store
+    chunks = iter_all_chunks(all_files, docs_dir, manifest, previous_manifest)
+    vector_store = asyncio.run(add_in_batches(chunks, EMBED_TOKEN_BUDGET, MAX_BATCH_CHUNKS))
     
-    # Save vector store
+    close_embedding_cache()
+    
+    if vector_store is None:
+        print("No chunks created. Exiting.")
+        return
+    
+    print(f"Generated {len(vector_store)} embeddings.")
+    
+    # Replace the previous vector store, removing its manifest first so that a
+    # failed save is not taken for a complete one by the next run
+    if previous_manifest:
+        os.remove(manifest_path)
     vector_store.save()
     
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    
     print("Vector store saved successfully.")
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from app.core import chunking
+from app.core.chunking import _fits_in_one_chunk, chunk_simple_text
+
+class ByteEncoder:
+    """A tokenizer with one token per UTF-8 byte, the most tokens any text can have."""
+    
+    def encode_ordinary(self, text):
+        return list(text.encode("utf-8"))
+    
+    def decode(self, ids):
+        return bytes(ids).decode("utf-8", errors="replace")
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch):
+    encoder = ByteEncoder()
+    monkeypatch.setattr(chunking, "_get_encoder", lambda model="gpt-4": encoder)
+    return encoder
+
+def _paragraphs(*letters, length=10):
+    return "\n\n".join(letter * length for letter in letters)
+
+def test_chunks_overlap_by_the_last_tokens_of_the_previous_chunk():
+    chunks = chunk_simple_text(_paragraphs("a", "b", "c", "d"), chunk_size=25, chunk_overlap=5)
+    
+    assert [chunk["content"] for chunk in chunks] == [
+        "a" * 10 + "\n\n" + "b" * 10,
+        "b" * 5 + "\n\n" + "c" * 10,
+        "c" * 5 + "\n\n" + "d" * 10
+    ]
+
+def test_short_chunks_are_carried_over_whole():
+    chunks = chunk_simple_text(_paragraphs("a", "b", "c"), chunk_size=15, chunk_overlap=10)
+    
+    assert [chunk["content"] for chunk in chunks] == [
+        "a" * 10,
+        "a" * 10 + "\n\n" + "b" * 10,
+        "b" * 10 + "\n\n" + "c" * 10
+    ]
+
+def test_chunks_without_overlap_start_at_the_next_piece():
+    chunks = chunk_simple_text(_paragraphs("a", "b", "c"), chunk_size=22, chunk_overlap=0)
+    
+    assert [chunk["content"] for chunk in chunks] == ["a" * 10 + "\n\n" + "b" * 10, "c" * 10]
+
+def test_overlap_is_counted_in_tokens(encoder):
+    text = "\n\n".join("é" * length for length in range(1, 20))
+    
+    chunks = chunk_simple_text(text, chunk_size=50, chunk_overlap=10)
+    
+    assert len(chunks) > 1
+    assert len(encoder.encode_ordinary(chunks[0]["content"])) <= 50
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert encoder.encode_ordinary(chunk["content"])[:10] == encoder.encode_ordinary(previous["content"])[-10:]
+
+def test_documents_within_the_byte_bound_are_not_tokenized(monkeypatch):
+    class FailingEncoder(ByteEncoder):
+        def encode_ordinary(self, text):
+            if text != "\n\n":
+                raise AssertionError("tokenized")
+            return super().encode_ordinary(text)
+    monkeypatch.setattr(chunking, "_get_encoder", lambda model="gpt-4": FailingEncoder())
+    
+    chunks = chunk_simple_text(_paragraphs("a", "b"), chunk_size=22)
+    
+    assert [chunk["content"] for chunk in chunks] == [_paragraphs("a", "b")]
+
+def test_byte_bound_never_admits_an_over_limit_text(encoder):
+    rng = random.Random(0)
+    alphabet = ["a", " ", "é", "€", "😀"]
+    
+    for _ in range(2000):
+        pieces = [("".join(rng.choices(alphabet, k=rng.randint(0, 8))), None) for _ in range(rng.randint(1, 4))]
+        separator = rng.choice(["\n", "\n\n", "·"])
+        chunk_size = rng.randint(1, 40)
+        
+        text = separator.join(piece for piece, _ in pieces)
+        if _fits_in_one_chunk(pieces, separator, chunk_size):
+            assert len(encoder.encode_ordinary(text)) <= chunk_size
+        else:
+            assert len(text.encode("utf-8")) > chunk_size
@@ -0,0 +1,24 @@
+from app.core import embeddings
+from app.core.embeddings import MAX_BATCH_INPUTS, MAX_BATCH_TOKENS, _make_batches
+
+def _count_characters(texts):
+    return [len(text) for text in texts]
+
+def test_texts_within_the_byte_bound_are_not_tokenized(monkeypatch):
+    def fail(texts):
+        raise AssertionError("tokenized")
+    monkeypatch.setattr(embeddings, "get_token_counts", fail)
+    
+    assert _make_batches(["x" * 1000] * 10) == [list(range(10))]
+    assert _make_batches(["x" * (MAX_BATCH_TOKENS + 1)]) == [[0]]
+
+def test_batches_keep_order_within_the_limits(monkeypatch):
+    monkeypatch.setattr(embeddings, "get_token_counts", _count_characters)
+    texts = ["é" * 600] * 300 + ["x" * (MAX_BATCH_TOKENS // 2)] * 3
+    
+    batches = _make_batches(texts)
+    
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    for batch in batches:
+        assert len(batch) <= MAX_BATCH_INPUTS
+        assert sum(len(texts[i]) for i in batch) <= MAX_BATCH_TOKENS
@@ -0,0 +1,65 @@
+import pickle
+
+import faiss
+import numpy as np
+import pytest
+
+from app.db.vector_store import FAISSVectorStore
+
+DIMENSION = 8
+
+def _documents(start: int, count: int):
+    return [{"content": f"doc {i}", "metadata": {"source": f"f{i}.md"}} for i in range(start, start + count)]
+
+def _embeddings(count: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+@pytest.fixture(autouse=True)
+def vector_db_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_DB_PATH", str(tmp_path))
+    return tmp_path
+
+def test_rerank_store_saves_over_its_mapped_vectors():
+    store = FAISSVectorStore(dimension=DIMENSION, index_type="IP", rerank=True)
+    store.add_documents(_documents(0, 200), _embeddings(200, 0))
+    store.save()
+    
+    # The loaded store memory-maps the vectors it then saves over, both as
+    # they are and after more documents are added
+    store = FAISSVectorStore(dimension=DIMENSION, index_type="IP", rerank=True)
+    assert store.load()
+    store.save()
+    added = _embeddings(10, 1)
+    store.add_documents(_documents(200, 10), added)
+    store.save()
+    
+    store = FAISSVectorStore(dimension=DIMENSION, index_type="IP", rerank=True)
+    assert store.load()
+    assert len(store) == 210
+    results = store.search(added[3], top_k=1)
+    assert results[0]["content"] == "doc 203"
+
+def test_legacy_store_is_migrated(vector_db_path):
+    # Stores saved before the Arrow format: a bare flat index and pickled documents
+    embeddings = _embeddings(20, 2)
+    faiss.normalize_L2(embeddings)
+    index = faiss.IndexFlatL2(DIMENSION)
+    index.add(embeddings)
+    faiss.write_index(index, str(vector_db_path / "vector_store.index"))
+    with open(vector_db_path / "vector_store.pkl", "wb") as f:
+        pickle.dump(_documents(0, 20), f)
+    
+    store = FAISSVectorStore(dimension=DIMENSION)
+    assert store.load()
+    assert store.search(embeddings[7], top_k=1)[0]["content"] == "doc 7"
+    
+    # Documents can be added to the migrated store, and it saves in the current format
+    added = _embeddings(5, 3)
+    store.add_documents(_documents(20, 5), added)
+    store.save()
+    
+    store = FAISSVectorStore(dimension=DIMENSION)
+    assert store.load()
+    assert len(store) == 25
+    assert store.search(embeddings[7], top_k=1)[0]["content"] == "doc 7"
+    assert store.search(added[2], top_k=1)[0]["content"] == "doc 22"
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import vectorize_docs
+from app.db.vector_store import FAISSVectorStore
+
+def test_unchanged_files_are_reused_and_changed_ones_rechunked(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    for name in ("a.md", "b.md", "c.md"):
+        (docs_dir / name).write_text(f"new {name}")
+    files = [str(docs_dir / name) for name in ("a.md", "b.md", "c.md")]
+    
+    # The last run stored two chunks of a.md and one of b.md; c.md is new
+    monkeypatch.setenv("VECTOR_DB_PATH", str(tmp_path / "vector_db"))
+    previous_store = FAISSVectorStore(dimension=4, index_type="IP")
+    previous_store.add_documents([
+        {"content": "old a.md 1", "metadata": {"source": "a.md"}},
+        {"content": "old b.md", "metadata": {"source": "b.md"}},
+        {"content": "old a.md 2", "metadata": {"source": "a.md"}}
+    ], np.eye(3, 4, dtype=np.float32))
+    previous_store.save()
+    
+    # Copying chunks needs only the documents, never the index
+    monkeypatch.setattr(FAISSVectorStore, "load", lambda self, filename=None: pytest.fail("index loaded"))
+    
+    chunked = []
+    def iter_file_chunks(paths, docs_dir):
+        chunked.extend(os.path.relpath(path, docs_dir) for path in paths)
+        for path in paths:
+            with open(path) as f:
+                yield [{"content": f.read(), "metadata": {"source": os.path.relpath(path, docs_dir)}}]
+    monkeypatch.setattr(vectorize_docs, "iter_file_chunks", iter_file_chunks)
+    
+    manifest = {"a.md": [1, 8], "b.md": [2, 8], "c.md": [3, 8]}
+    previous_manifest = {"a.md": [1, 8], "b.md": [1, 8]}
+    chunks = list(vectorize_docs.iter_all_chunks(files, str(docs_dir), manifest, previous_manifest))
+    
+    assert chunked == ["b.md", "c.md"]
+    assert [chunk["content"] for chunk in chunks] == ["old a.md 1", "old a.md 2", "new b.md", "new c.md"]
@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+# The documentation directory is read when the app is imported
+DOCS_DIR = tempfile.mkdtemp()
+os.environ["DOCS_DIR"] = DOCS_DIR
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app, templates, _compile_shell, _shell_fields, _stream_page, _CSVTable
+
+client = TestClient(app)
+
+def _write_doc(name: str, data: bytes) -> None:
+    with open(os.path.join(DOCS_DIR, name), "wb") as f:
+        f.write(data)
+
+def test_csv_is_rendered_as_table():
+    _write_doc("table.csv", b"name,value\na,<1>\nb,2\n")
+    
+    response = client.get("/docs/table.csv")
+    
+    assert response.status_code == 200
+    assert "<th style" in response.text
+    assert "&lt;1&gt;" in response.text
+    assert "<strong>Rows:</strong> 3" in response.text
+
+def test_csv_with_late_invalid_byte_is_an_error():
+    # The invalid byte comes well after the first streamed slice of the page
+    _write_doc("late.csv", b"name,value\n" + b"a,1\n" * 100000 + b"b,\xff\n")
+    
+    response = client.get("/docs/late.csv")
+    
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Error reading file:")
+
+@pytest.mark.parametrize("name, body", [
+    ("view_markdown.html", lambda: "<h1>{title}</h1>"),
+    ("view_code.html", lambda: ["def f():\n", "    return {'a': 1} &lt; 2\n"]),
+    ("view_csv.html", lambda: _CSVTable("a,b\n{1},<2>\n", "csv")),
+    ("view_text.html", lambda: ["plain {text}", " &amp; more"])
+])
+def test_shell_matches_template(name, body):
+    values = {"file_path": "dir/{odd} <name>.txt", "api_title": "An \"API\" & more", "file_type": "csv", "language": "python"}
+    
+    rendered = templates.get_template(name).render(body=body(), **values)
+    shell = _compile_shell(name)
+    
+    assert "".join(_stream_page(shell, _shell_fields(**values), body())) == rendered
+
+def test_etag_changes_with_the_shells(monkeypatch):
+    _write_doc("tagged.txt", b"some text")
+    etag = client.get("/docs/tagged.txt").headers["ETag"]
+    
+    assert client.get("/docs/tagged.txt", headers={"If-None-Match": etag}).status_code == 304
+    
+    monkeypatch.setattr(main, "VIEW_SHELLS_VERSION", "0" * 8)
+    assert client.get("/docs/tagged.txt", headers={"If-None-Match": etag}).status_code == 200
+
+def test_only_small_bodies_are_cached():
+    main._render_escaped_body.cache_clear()
+    _write_doc("small.txt", b"small")
+    _write_doc("large.txt", b"x" * (main.VIEW_CACHE_MAX_FILE_BYTES + 1))
+    
+    for _ in range(2):
+        assert client.get("/docs/small.txt").status_code == 200
+        assert client.get("/docs/large.txt").status_code == 200
+    
+    info = main._render_escaped_body.cache_info()
+    assert (info.hits, info.currsize) == (1, 1)